@@ -1,17 +1,14 @@
-import numpy as np
+import argparse
 import cv2
-import win32gui
-import win32con
-import ctypes
 import time
 import random
 import sys
-from pynput import mouse
 
-ctypes.windll.user32.SetProcessDPIAware()
-user32 = ctypes.windll.user32
-SCREEN_WIDTH = user32.GetSystemMetrics(0)
-SCREEN_HEIGHT = user32.GetSystemMetrics(1)
+import startup
+from latency import EventClock, TrialLog, now_ns
+from overlay import Compositor, force_topmost, open_window, screen_size
+from session_store import DB_FILE, SessionStore
+from targets import SCENARIOS, TargetField, TargetRenderer
 
 WINDOW_NAME = "Aim Trainer Overlay"
 NUM_CIRCLES = 10
@@ -19,90 +16,152 @@ CIRCLE_RADIUS = 25
 CIRCLE_COLOR = (0, 0, 255)  
 CIRCLE_THICKNESS = 3
 
-cv2.namedWindow(WINDOW_NAME, cv2.WINDOW_NORMAL)
-cv2.setWindowProperty(WINDOW_NAME, cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
-hwnd = win32gui.FindWindow(None, WINDOW_NAME)
-
-win32gui.SetWindowLong(
-    hwnd,
-    win32con.GWL_EXSTYLE,
-    win32gui.GetWindowLong(hwnd, win32con.GWL_EXSTYLE)
-    | win32con.WS_EX_LAYERED
-    | win32con.WS_EX_TOPMOST
-    | win32con.WS_EX_TRANSPARENT
-)
-win32gui.SetLayeredWindowAttributes(hwnd, 0x000000, 0, win32con.LWA_COLORKEY)
-
-def force_topmost():
-    win32gui.SetWindowPos(
-        hwnd,
-        win32con.HWND_TOPMOST,
-        0, 0, 0, 0,
-        win32con.SWP_NOMOVE | win32con.SWP_NOSIZE | win32con.SWP_NOACTIVATE | win32con.SWP_SHOWWINDOW
-    )
-
-def random_circle():
-    x = random.randint(CIRCLE_RADIUS, SCREEN_WIDTH - CIRCLE_RADIUS)
-    y = random.randint(CIRCLE_RADIUS, SCREEN_HEIGHT - CIRCLE_RADIUS)
+def random_circle(screen_width, screen_height):
+    x = random.randint(CIRCLE_RADIUS, screen_width - CIRCLE_RADIUS)
+    y = random.randint(CIRCLE_RADIUS, screen_height - CIRCLE_RADIUS)
     return (x, y)
 
-circles = [random_circle() for _ in range(NUM_CIRCLES)]
-reaction_times = []
-current = 0
-start_time = None
-running = True
-
-# Mouse click handler
-def on_click(x, y, button, pressed):
-    global current, start_time, running
-    if not pressed or current >= NUM_CIRCLES:
+def run_scenario(args):
+    # many moving targets; see targets.py
+    from pynput import mouse
+
+    screen_width, screen_height = screen_size()
+    hwnd = open_window(WINDOW_NAME)
+    field = TargetField(screen_width, screen_height, seed=args.seed, **SCENARIOS[args.scenario])
+    renderer = TargetRenderer(screen_width, screen_height, CIRCLE_COLOR, CIRCLE_THICKNESS)
+
+    def on_click(x, y, button, pressed):
+        if pressed:
+            field.hit_test(x, y)
+
+    listener = mouse.Listener(on_click=on_click)
+    listener.start()
+
+    start = last = time.perf_counter()
+    frames = 0
+    last_force = 0
+    while True:
+        now = time.perf_counter()
+        if now - start >= args.duration:
+            break
+        if now - last_force > 0.2:
+            force_topmost(hwnd)
+            last_force = now
+        field.step(now - last)
+        last = now
+        frame = renderer.draw(field)
+        renderer.text(f"{args.scenario}  hits {len(field.hit_ages)}  {args.duration - (now - start):.0f}s",
+                      (50, 50), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (0, 255, 0), 2)
+        cv2.imshow(WINDOW_NAME, frame)
+        frames += 1
+        startup.first_frame("aim_train")
+        if cv2.waitKey(1) & 0xFF == 27:
+            break
+
+    listener.stop()
+    cv2.destroyAllWindows()
+    field.step(0)  # apply clicks that arrived after the last frame
+    elapsed = time.perf_counter() - start
+    hits = field.hit_ages
+    print(f"Scenario: {args.scenario} ({elapsed:.1f}s, {frames / elapsed:.0f} fps)")
+    print(f"Hits: {len(hits)}  Misses: {field.misses}  Expired: {field.expired}")
+    if hits:
+        print(f"Average time to hit: {sum(hits) / len(hits):.3f}s")
+        print(f"Accuracy: {len(hits) / (len(hits) + field.misses) * 100:.1f}%")
+
+def main():
+    parser = argparse.ArgumentParser(description="Aim trainer overlay")
+    parser.add_argument("--db", default=DB_FILE, help="SQLite session log the per-trial latency breakdown is written to")
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), help="moving multi-target drill instead of the 10 circles")
+    parser.add_argument("--duration", type=float, default=60.0, help="seconds a scenario runs for")
+    parser.add_argument("--seed", type=int, help="random seed for reproducible scenarios")
+    args = parser.parse_args()
+
+    if args.scenario:
+        run_scenario(args)
         return
-    cx, cy = circles[current]
-    # Check if click inside circle
-    if (x - cx) ** 2 + (y - cy) ** 2 <= CIRCLE_RADIUS ** 2:
-        reaction_times.append(time.time() - start_time)
-        current += 1
-        if current < NUM_CIRCLES:
-            start_time = time.time()
-        else:
-            running = False
 
-listener = mouse.Listener(on_click=on_click)
-listener.start()
-start_time = time.time()
+    from pynput import mouse
 
-last_force = 0
-while running:
-    if time.time() - last_force > 0.2:
-        force_topmost()
-        last_force = time.time()
+    screen_width, screen_height = screen_size()
+    hwnd = open_window(WINDOW_NAME)
 
-    overlay = np.zeros((SCREEN_HEIGHT, SCREEN_WIDTH, 3), dtype=np.uint8)
+    circles = [random_circle(screen_width, screen_height) for _ in range(NUM_CIRCLES)]
+    current = 0
+    running = True
+    clock = EventClock()
+    log = TrialLog()
 
-    if current < NUM_CIRCLES:
+    # Mouse click handler
+    def on_click(x, y, button, pressed):
+        nonlocal current, running
+        if not pressed or current >= NUM_CIRCLES:
+            return
+        callback_ns = now_ns()
+        event_ns = clock.event_time(callback_ns)
         cx, cy = circles[current]
-        cv2.circle(overlay, (cx, cy), CIRCLE_RADIUS, CIRCLE_COLOR, CIRCLE_THICKNESS)
-        cv2.putText(
-            overlay,
-            f"Click the circle ({current + 1}/{NUM_CIRCLES})",
-            (50, 50),
-            cv2.FONT_HERSHEY_SIMPLEX,
-            1.0,
-            (0, 255, 0),
-            2
-        )
-
-    cv2.imshow(WINDOW_NAME, overlay)
-    if cv2.waitKey(1) & 0xFF == 27:
-        running = False
-
-listener.stop()
-cv2.destroyAllWindows()
-
-print("Reaction times (seconds):")
-for i, t in enumerate(reaction_times, 1):
-    print(f"Circle {i}: {t:.3f}s")
-if reaction_times:
-    print(f"Average reaction time: {sum(reaction_times)/len(reaction_times):.3f}s")
-
-sys.exit()
\ No newline at end of file
+        # Check if click inside circle
+        if (x - cx) ** 2 + (y - cy) ** 2 <= CIRCLE_RADIUS ** 2:
+            # the next target and its trial appear to the renderer together
+            with log.lock:
+                if log.hit(event_ns, callback_ns) is None:
+                    return
+                current += 1
+                if current < NUM_CIRCLES:
+                    log.begin(current, callback_ns)
+                else:
+                    running = False
+
+    # the first trial is open before any click can reach on_click
+    log.begin(current)
+    listener = mouse.Listener(on_click=on_click, win32_event_filter=clock.win32_filter)
+    listener.start()
+
+    overlay = Compositor(WINDOW_NAME, screen_width, screen_height)
+    last_force = 0
+    while running:
+        if time.time() - last_force > 0.2:
+            force_topmost(hwnd)
+            last_force = time.time()
+
+        with log.lock:
+            shown = current
+        if shown < NUM_CIRCLES:
+            cx, cy = circles[shown]
+            overlay.circle((cx, cy), CIRCLE_RADIUS, CIRCLE_COLOR, CIRCLE_THICKNESS)
+            overlay.text(
+                f"Click the circle ({shown + 1}/{NUM_CIRCLES})",
+                (50, 50),
+                cv2.FONT_HERSHEY_SIMPLEX,
+                1.0,
+                (0, 255, 0),
+                2
+            )
+
+        overlay.present()
+        key = cv2.waitKey(1)
+        # the window has painted once waitKey has pumped its messages
+        log.presented(shown)
+        startup.first_frame("aim_train")
+        if key & 0xFF == 27:
+            running = False
+
+    listener.stop()
+    cv2.destroyAllWindows()
+
+    trials = log.trials
+    with SessionStore(args.db, "aim_train") as store:
+        for t in trials:
+            store.trial(time.time(), t.index + 1, t.reaction_ms, t.raw_ms, t.render_ms, t.dispatch_ms)
+
+    print("Reaction times (seconds, from the target appearing to the click):")
+    for t in trials:
+        print(f"Circle {t.index + 1}: {t.reaction_ms / 1000:.3f}s  "
+              f"(raw {t.raw_ms / 1000:.3f}s, render {t.render_ms:.1f}ms, input dispatch {t.dispatch_ms:.1f}ms)")
+    if trials:
+        print(f"Average reaction time: {sum(t.reaction_ms for t in trials) / len(trials) / 1000:.3f}s")
+        print(f"Average overlay render latency removed: {sum(t.render_ms for t in trials) / len(trials):.1f}ms")
+
+if __name__ == "__main__":
+    main()
+    sys.exit()
@@ -0,0 +1,314 @@
+import argparse
+import importlib.util
+import json
+import os
+import sys
+import time
+import types
+
+import cv2
+import numpy as np
+
+import coach
+import color_lut
+import crosshair
+import template_match
+
+# Headless speed / accuracy benchmark for the crosshair offset detectors.
+# Frames are synthetic but game-like: a textured background with walls and
+# bright sky patches that drifts like a moving camera, a crosshair drawn at a
+# known vertical offset from the screen centre (one of the usual colours per
+# clip, as a player keeps theirs), two-frame muzzle flashes and a round-end
+# banner in the HUD strip. Every detector runs on the same centre crops (gray,
+# or BGRA as captured for the colour detector, which first calibrates on the
+# clip's opening frames) for each resolution and crop size, and reports
+# frames/sec, p50/p99 latency per frame, how often it found anything and its
+# offset error. The flashes and banners are also fed through
+# CoachState to count the shots and round ends coach.py would report.
+#
+# Results are compared against bench_baselines.json; slower, less accurate or
+# differently-counting runs fail. Speed is stored as each detector's p50
+# latency over the reference detector's (coach.py's single-frame Canny) on
+# the same crops in the same run, with the detectors interleaved across the
+# repeats, so the baseline carries over between machines and a busy machine
+# slows both sides of the ratio. Rerun with --update after an intended change.
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_baselines.json")
+BACKEND_COACH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "submissions",
+                             "First Chorus - Vandalytics", "Backend", "coach.py")
+RESOLUTIONS = ["1280x720", "1920x1080", "2560x1440"]
+CROP_RATIOS = [0.1, 0.2, 0.3]
+CROSSHAIR_COLORS = [(255, 255, 255), (0, 255, 0), (255, 255, 0), (0, 255, 255), (255, 0, 255)]
+# coach.py's defaults, for the shot / round-end count
+EVENT_ARGS = {"smooth_frames": 7, "shot_threshold": 180, "shot_cooldown": 0.12, "round_ui_threshold": 140}
+EVENT_CROP_RATIO = 0.2
+FPS = 60.0
+WARMUP = 40           # crops each detector runs untimed before its passes
+REFERENCE = "coach"
+# what --update keeps; absolute timings only mean something on this machine
+BASELINE_KEYS = ("p50_ratio", "found", "err_p50", "err_p99")
+
+
+def parse_resolution(text):
+    w, _, h = text.partition("x")
+    return int(w), int(h)
+
+
+# ---------- synthetic frames ----------
+
+def background(rng, w, h):
+    # a canvas 25% larger than the screen, so the camera can pan over it
+    cw, ch = int(w * 1.25), int(h * 1.25)
+    coarse = rng.integers(0, 256, (ch // 16 + 1, cw // 16 + 1, 3), dtype=np.uint8)
+    canvas = cv2.resize(coarse, (cw, ch), interpolation=cv2.INTER_CUBIC)
+    canvas = (canvas * 0.35 + 20).astype(np.uint8)
+    for _ in range(12):
+        x0, y0 = int(rng.integers(0, cw)), int(rng.integers(0, ch))
+        x1, y1 = x0 + int(rng.integers(cw // 20, cw // 4)), y0 + int(rng.integers(ch // 20, ch // 3))
+        shade = int(rng.integers(40, 120))
+        cv2.rectangle(canvas, (x0, y0), (x1, y1), (shade, shade + 10, shade + 20), -1)
+    for _ in range(3):
+        # bright walls / sky, which intensity thresholds latch onto
+        x0, y0 = int(rng.integers(0, cw)), int(rng.integers(0, ch // 2))
+        x1, y1 = x0 + int(rng.integers(cw // 16, cw // 6)), y0 + int(rng.integers(ch // 16, ch // 6))
+        cv2.rectangle(canvas, (x0, y0), (x1, y1), (235, 225, 215), -1)
+    grain = rng.integers(0, 12, canvas.shape, dtype=np.uint8)
+    return cv2.add(canvas, grain)
+
+
+def draw_crosshair(img, centre, color, scale):
+    # four arms with a gap, a centre dot and a thin dark outline
+    cx, cy = centre
+    arm, gap, t = int(6 * scale), int(3 * scale), max(1, int(2 * scale))
+    arms = [((cx - gap - arm, cy), (cx - gap, cy)), ((cx + gap, cy), (cx + gap + arm, cy)),
+            ((cx, cy - gap - arm), (cx, cy - gap)), ((cx, cy + gap), (cx, cy + gap + arm))]
+    for p1, p2 in arms:
+        cv2.line(img, p1, p2, (0, 0, 0), t + 2)
+    for p1, p2 in arms:
+        cv2.line(img, p1, p2, color, t)
+    cv2.circle(img, (cx, cy), t, color, -1)
+
+
+def frames(rng, w, h, count, color):
+    """Yields (BGR frame, true offset, flash, banner) for a synthetic clip."""
+    canvas = background(rng, w, h)
+    max_dx, max_dy = canvas.shape[1] - w, canvas.shape[0] - h
+    x, y = max_dx / 2, max_dy / 2
+    crop = int(min(w, h) * min(CROP_RATIOS))
+    scale = h / 1080
+    ui_x, ui_y, ui_w, ui_h = coach.ui_box(w, h)
+    next_flash, flash_left = int(rng.integers(10, 30)), 0
+    next_banner, banner_left = int(rng.integers(60, 120)), 0
+    for i in range(count):
+        # smooth camera pan
+        x = float(np.clip(x + rng.normal(0, 3 * scale), 0, max_dx))
+        y = float(np.clip(y + rng.normal(0, 2 * scale), 0, max_dy))
+        frame = canvas[int(y):int(y) + h, int(x):int(x) + w].copy()
+
+        offset = int(rng.integers(-crop // 3, crop // 3 + 1))
+        draw_crosshair(frame, (w // 2, h // 2 + offset), color, scale)
+
+        if i == next_flash:
+            flash_left, next_flash = 2, i + int(rng.integers(20, 45))
+        flash = flash_left > 0
+        if flash:
+            flash_left -= 1
+            glow = np.zeros_like(frame)
+            cv2.circle(glow, (w // 2, h // 2 + h // 20), int(min(w, h) * 0.3), (200, 230, 255), -1)
+            frame = cv2.add(frame, cv2.GaussianBlur(glow, (0, 0), 8 * scale))
+
+        if i == next_banner:
+            banner_left, next_banner = int(rng.integers(30, 60)), i + int(rng.integers(150, 250))
+        # dark score bar, replaced by a bright banner at round end
+        banner = banner_left > 0
+        if banner:
+            banner_left -= 1
+        shade = 235 if banner else 30
+        cv2.rectangle(frame, (ui_x, ui_y), (ui_x + ui_w, ui_y + ui_h), (shade, shade, shade), -1)
+        yield frame, offset, flash, banner
+
+
+# ---------- detectors ----------
+
+def load_backend_detector():
+    # Backend/coach.py is a separate script; load just its module object
+    spec = importlib.util.spec_from_file_location("backend_coach", BACKEND_COACH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.detect_offset
+
+
+def best_of(names, grays, bgras, repeat):
+    # {name: (offsets, times)} with every frame's fastest time over the
+    # passes; the detectors take turns within every pass so a slow spell hits
+    # all of them
+    best = {}
+    for name in names:
+        # untimed warm-up: plans, caches and the first allocations
+        DETECTORS[name](grays[:WARMUP], bgras[:WARMUP])
+    for _ in range(repeat):
+        for name in names:
+            offsets, times = DETECTORS[name](grays, bgras)
+            best[name] = offsets, np.minimum(best[name][1], times) if name in best else times
+    return best
+
+
+def run_single(detect, crops):
+    offsets, times = [], []
+    for gray in crops:
+        t0 = time.perf_counter()
+        offsets.append(detect(gray))
+        times.append(time.perf_counter() - t0)
+    return offsets, np.array(times)
+
+
+def run_color(_, crops):
+    # calibration is a one-off at startup, so it isn't timed
+    calibration = color_lut.Calibration()
+    for crop in crops[:calibration.frames]:
+        calibration.add(crop)
+    return run_single(color_lut.ColorLut(calibration.bins()).detect_offset, crops)
+
+
+# each takes the gray and the BGRA crops and returns (offsets, seconds per frame)
+DETECTORS = {
+    "coach": lambda grays, _: run_single(coach.detect_offset, grays),
+    "backend": None,  # loaded on first use, the script prints on import
+    # (it returns 0 for "nothing found" too, so a 0 counts as not found)
+    "crosshair": lambda grays, _: run_single(crosshair.detect_offset, grays),
+    "template": lambda grays, _: run_single(template_match.detect_offset, grays),
+    "color": run_color,
+}
+
+
+def score(offsets, times, truth):
+    found = np.array([o is not None for o in offsets])
+    err = np.array([abs(o - t) for o, t in zip(offsets, truth) if o is not None], dtype=np.float64)
+    return {
+        "fps": round(len(times) / times.sum(), 1),
+        "p50_ms": round(float(np.percentile(times, 50)) * 1000, 3),
+        "p99_ms": round(float(np.percentile(times, 99)) * 1000, 3),
+        "found": round(float(found.mean()), 3),
+        "err_p50": round(float(np.percentile(err, 50)), 1) if len(err) else None,
+        "err_p99": round(float(np.percentile(err, 99)), 1) if len(err) else None,
+    }
+
+
+def count_events(samples):
+    # shots / round ends CoachState detects vs. flashes / banner edges drawn
+    state = coach.CoachState(types.SimpleNamespace(**EVENT_ARGS))
+    shots = rounds = 0
+    for i, (gray, ui_b) in enumerate(samples):
+        for kind, _ in state.step(coach.detect_offset(gray), float(np.mean(gray)), ui_b, i / FPS):
+            shots += kind == "shot"
+            rounds += kind == "round"
+    return shots, rounds
+
+
+# ---------- baselines ----------
+
+def compare(name, row, base, args):
+    # list of regressions of row against its baseline
+    problems = []
+    if "p50_ratio" not in base:
+        return [f"{name}: {key} {row.get(key)} != {base[key]}" for key in base if row.get(key) != base[key]]
+    # median latency is steadier than fps, which one stall drags down
+    if row["p50_ratio"] > base["p50_ratio"] * (1 + args.speed_tolerance):
+        problems.append(f"p50 {row['p50_ratio']}x {REFERENCE} > {base['p50_ratio']}x")
+    if row["found"] < base["found"] - 0.02:
+        problems.append(f"found {row['found']} < {base['found']}")
+    for key in ("err_p50", "err_p99"):
+        if base.get(key) is not None and (row[key] is None or row[key] > base[key] + args.error_tolerance):
+            problems.append(f"{key} {row[key]} > {base[key]}")
+    return [f"{name}: {p}" for p in problems]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the crosshair detectors on synthetic frames against stored baselines")
+    parser.add_argument("--detectors", nargs="+", choices=list(DETECTORS), default=list(DETECTORS))
+    parser.add_argument("--resolutions", nargs="+", default=RESOLUTIONS, help="WIDTHxHEIGHT frame sizes")
+    parser.add_argument("--crop-ratios", nargs="+", type=float, default=CROP_RATIOS, help="Centre crop side as a fraction of the screen height")
+    parser.add_argument("--frames", type=int, default=300, help="Synthetic frames per resolution")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3, help="Passes per detector (each frame's fastest is kept)")
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--update", action="store_true", help="Write this run's results as the new baseline")
+    # the FFT detector's timing alone swings ~1.6x between runs on one machine
+    parser.add_argument("--speed-tolerance", type=float, default=1.0,
+                        help=f"Allowed fractional rise in p50 latency relative to {REFERENCE} before failing")
+    parser.add_argument("--error-tolerance", type=float, default=1.0, help="Allowed rise in offset error (px) before failing")
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    if "backend" in args.detectors:
+        detect = load_backend_detector()
+        DETECTORS["backend"] = lambda grays, _: run_single(lambda gray: detect(gray) or None, grays)
+
+    rng = np.random.default_rng(args.seed)
+    results = {}
+    for k, res in enumerate(args.resolutions):
+        w, h = parse_resolution(res)
+        color = CROSSHAIR_COLORS[k % len(CROSSHAIR_COLORS)]
+        sizes = [int(min(w, h) * r) for r in args.crop_ratios]
+        crops = {size: [] for size in sizes}
+        truth, samples = [], []
+        flashes = banners = 0
+        was_flash = was_banner = False
+        for frame, offset, flash, banner in frames(rng, w, h, args.frames, color):
+            for size in sizes:
+                crops[size].append(cv2.cvtColor(coach.center_crop(frame, size), cv2.COLOR_BGR2BGRA))
+            truth.append(offset)
+            samples.append(coach.measure(frame, EVENT_CROP_RATIO))
+            flashes += flash and not was_flash
+            banners += banner != was_banner
+            was_flash, was_banner = flash, banner
+
+        shots, rounds = count_events(samples)
+        results[f"events {res}"] = {"flashes": flashes, "shots": shots, "banner_changes": banners, "rounds": rounds}
+        print(f"{res}: {shots}/{flashes} shots, {rounds}/{banners} round-end changes detected")
+
+        for size in sizes:
+            bgras = crops.pop(size)
+            grays = [cv2.cvtColor(c, cv2.COLOR_BGRA2GRAY) for c in bgras]
+            names = [REFERENCE] + [n for n in args.detectors if n != REFERENCE]
+            best = best_of(names, grays, bgras, args.repeat)
+            reference = float(np.median(best[REFERENCE][1]))
+            for name in args.detectors:
+                offsets, times = best[name]
+                row = score(offsets, times, truth)
+                row["p50_ratio"] = round(float(np.median(times)) / reference, 2)
+                key = f"{name} {res} crop{size}"
+                results[key] = row
+                err = f"err p50 {row['err_p50']} p99 {row['err_p99']} px" if row["err_p50"] is not None else "no detections"
+                print(f"{key:32s} {row['fps']:9.1f} fps  p50 {row['p50_ms']:.3f} ms ({row['p50_ratio']:.2f}x)  "
+                      f"p99 {row['p99_ms']:.3f} ms  found {row['found'] * 100:5.1f}%  {err}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.update:
+        portable = {key: {k: v for k, v in row.items() if k in BASELINE_KEYS or key.startswith("events")}
+                    for key, row in results.items()}
+        with open(args.baseline, "w") as f:
+            json.dump(portable, f, indent=2, sort_keys=True)
+        print(f"Baseline written to {args.baseline}")
+        return
+
+    try:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    except OSError:
+        print(f"No baseline at {args.baseline}; run with --update to create one")
+        return
+    problems = []
+    for key, row in results.items():
+        if key in baseline:
+            problems += compare(key, row, baseline[key], args)
+    for p in problems:
+        print("REGRESSION", p)
+    print(f"{len(results)} results, {len(problems)} regressions against {args.baseline}")
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+import cv2
+import numpy as np
+
+# Region-only screen capture shared by the analysers.
+# Only the boxes the pipeline actually reads are grabbed, mss's raw BGRA buffer
+# is wrapped as a numpy view (no copy), and colour conversion runs on the crops.
+
+
+def region(monitor, left, top, width, height):
+    # monitor-relative box -> absolute mss region, clamped to the monitor
+    x0 = max(0, left)
+    y0 = max(0, top)
+    x1 = min(monitor["width"], left + width)
+    y1 = min(monitor["height"], top + height)
+    return {
+        "left": monitor["left"] + x0,
+        "top": monitor["top"] + y0,
+        "width": max(0, x1 - x0),
+        "height": max(0, y1 - y0),
+    }
+
+
+def center_region(monitor, size):
+    # same box center_crop() used to slice out of a full-monitor frame
+    cx, cy = monitor["width"] // 2, monitor["height"] // 2
+    half = size // 2
+    return region(monitor, cx - half, cy - half, 2 * half, 2 * half)
+
+
+def bgra_view(shot):
+    # (h, w, 4) uint8 view over the screenshot's buffer, no copy
+    return np.frombuffer(shot.raw, dtype=np.uint8).reshape(shot.height, shot.width, 4)
+
+
+def open_bus(name):
+    # attach to a running frame bus, or None so the caller captures by itself
+    if not name:
+        return None
+    from frame_bus import FrameBus
+
+    try:
+        return FrameBus.attach(name)
+    except FileNotFoundError:
+        print(f"Frame bus '{name}' is not running; capturing the screen directly")
+        return None
+
+
+class RegionCapture:
+    """Grabs named screen regions instead of the whole monitor."""
+
+    def __init__(self, sct, monitor):
+        self.sct = sct
+        self.monitor = monitor
+        self.regions = {}
+
+    def add(self, name, left, top, width, height):
+        self.regions[name] = region(self.monitor, left, top, width, height)
+        return self.regions[name]
+
+    def add_center(self, name, size):
+        self.regions[name] = center_region(self.monitor, size)
+        return self.regions[name]
+
+    def origin(self, name):
+        # top-left of the region relative to the monitor
+        r = self.regions[name]
+        return r["left"] - self.monitor["left"], r["top"] - self.monitor["top"]
+
+    def new_frame(self):
+        # every grab is a fresh screenshot; BusCapture overrides this
+        return True
+
+    def grab(self, name):
+        r = self.regions[name]
+        if r["width"] == 0 or r["height"] == 0:
+            return None
+        return bgra_view(self.sct.grab(r))
+
+    def gray(self, name):
+        bgra = self.grab(name)
+        if bgra is None:
+            return None
+        return cv2.cvtColor(bgra, cv2.COLOR_BGRA2GRAY)
+
+    def bgr(self, name):
+        bgra = self.grab(name)
+        if bgra is None:
+            return None
+        return cv2.cvtColor(bgra, cv2.COLOR_BGRA2BGR)
+
+
+class BusCapture(RegionCapture):
+    """RegionCapture that slices frames published on a FrameBus.
+
+    Call new_frame() once per iteration; every grab() until the next call
+    returns a view into that same frame, so regions stay consistent. The
+    regions added are subscribed on the bus, so the producer only captures
+    their bounding box, and new_frame() keeps the subscription alive.
+    """
+
+    def __init__(self, bus, timeout=0.05):
+        super().__init__(None, bus.monitor)
+        self.bus = bus
+        self.timeout = timeout
+        self.seq = 0
+        self.timestamp_ns = 0
+        self.frame = None
+        self.box = None
+
+    def add(self, name, left, top, width, height):
+        r = super().add(name, left, top, width, height)
+        self._subscribe()
+        return r
+
+    def add_center(self, name, size):
+        r = super().add_center(name, size)
+        self._subscribe()
+        return r
+
+    def _subscribe(self):
+        boxes = []
+        for name, r in self.regions.items():
+            if r["width"] and r["height"]:
+                x, y = self.origin(name)
+                boxes.append((x, y, x + r["width"], y + r["height"]))
+        if boxes:
+            self.box = tuple(f(b[i] for b in boxes) for i, f in enumerate((min, min, max, max)))
+            self.bus.subscribe(self.box)
+
+    def new_frame(self):
+        # False if the producer published nothing newer within the timeout, or
+        # the frame was captured before our regions were subscribed
+        self.bus.renew()
+        item = self.bus.wait_newer(self.seq, self.timeout)
+        if item is None:
+            return False
+        self.seq = item[0]
+        if self.box is not None and not self.bus.covers(self.seq, self.box):
+            return False
+        self.timestamp_ns, self.frame = item[1], item[2]
+        return True
+
+    def grab(self, name):
+        r = self.regions[name]
+        if self.frame is None or r["width"] == 0 or r["height"] == 0:
+            return None
+        x, y = self.origin(name)
+        return self.frame[y:y + r["height"], x:x + r["width"]]
@@ -0,0 +1,45 @@
+import cv2
+import numpy as np
+
+# Cheap "did the crop change?" test used to skip the contour detector while
+# the view is static. The crop is shrunk to a small thumbnail and compared with
+# the thumbnail of the last frame that was actually analysed (not the previous
+# frame, so slow drift still adds up to a rerun).
+
+
+class ChangeDetector:
+    """Thumbnail-difference gate with a staleness limit.
+
+    threshold is the largest per-cell change (0-255) still treated as
+    "unchanged"; 0 turns the gate off. After max_skip skipped frames in a row
+    detection is forced to run again regardless.
+    """
+
+    def __init__(self, threshold=6.0, max_skip=10, size=32):
+        self.threshold = threshold
+        self.max_skip = max_skip
+        self.size = size
+        self.ref = None
+        self.run_length = 0
+        self.frames = 0
+        self.skipped = 0
+
+    def changed(self, gray):
+        self.frames += 1
+        if self.threshold <= 0:
+            return True
+        thumb = cv2.resize(gray, (self.size, self.size), interpolation=cv2.INTER_AREA)
+        if self.ref is not None and self.run_length < self.max_skip and thumb.shape == self.ref.shape:
+            if float(np.max(cv2.absdiff(thumb, self.ref))) <= self.threshold:
+                self.run_length += 1
+                self.skipped += 1
+                return False
+        self.ref = thumb
+        self.run_length = 0
+        return True
+
+    def skip_ratio(self):
+        return self.skipped / self.frames if self.frames else 0.0
+
+    def summary(self):
+        return f"change detector: skipped {self.skipped}/{self.frames} frames ({self.skip_ratio() * 100:.1f}%)"
@@ -1,13 +1,23 @@
 import time
 import argparse
-import csv
 import os
-import statistics
 from collections import deque
+from concurrent.futures import ProcessPoolExecutor
  
 import cv2
 import numpy as np
-from PIL import Image, ImageDraw, ImageFont
+
+import startup
+import color_lut
+from capture import BusCapture, RegionCapture, center_region, open_bus, region
+from pipeline import Pipeline
+from player_classifier import PlayerClassifier
+from session_store import DB_FILE, SessionStore
+import streaming_stats
+import template_match
+from streaming_stats import RunningStats
+from telemetry import TelemetryClient
+from text_sprites import TextSprites
  
 # Minimal, consolidated AI coach
 FONT_CANDIDATES = [
@@ -17,10 +27,15 @@ FONT_CANDIDATES = [
     "Rajdhani-Regular.ttf",
 ]
  
+LIFETIME_FILE = "coach_lifetime.json"
 CSV_FILE = "round_stats.csv"
+PLAYER_HOLD = 0.25  # seconds a player detection keeps stats counting (muzzle flash hides the model)
  
  
 def load_font(size=24):
+    # PIL is only needed once a font is actually asked for
+    from PIL import ImageFont
+
     for p in FONT_CANDIDATES:
         try:
             return ImageFont.truetype(p, size)
@@ -29,9 +44,6 @@ def load_font(size=24):
     return ImageFont.load_default()
  
  
-font = load_font(24)
- 
- 
 def center_crop(frame, size):
     h, w = frame.shape[:2]
     cx, cy = w // 2, h // 2
@@ -51,38 +63,315 @@ def detect_offset(gray):
         return None
     cy = int(M.get("m01", 0) / M.get("m00", 1))
     return cy - (gray.shape[0] // 2)
+
+
+# --detector choices; all take a gray crop and return px from its centre or None
+DETECTORS = {
+    "edges": detect_offset,
+    "template": template_match.detect_offset,
+}
+ 
+ 
+PANEL_W, PANEL_H = 360, 184
+sprites = TextSprites()
+_panel = {}
+ 
+ 
+def panel_base():
+    # static part of the panel (background, title, rule), rendered once
+    if "base" not in _panel:
+        w, h = PANEL_W, PANEL_H
+        overlay = np.zeros((h, w, 3), dtype=np.uint8)
+        overlay[:] = (35, 35, 35)
+ 
+        # title
+        title = "Vandalytics"
+        (txt_w, txt_h), _ = cv2.getTextSize(title, cv2.FONT_HERSHEY_SIMPLEX, 0.9, 2)
+        tx = max(8, (w - txt_w) // 2)
+        ty = 24
+        cv2.putText(overlay, title, (tx, ty), cv2.FONT_HERSHEY_SIMPLEX, 0.9, (0, 0,255), 2, cv2.LINE_AA)
+        cv2.line(overlay, (8, ty + 6), (w - 8, ty + 6), (60, 60, 60), 1)
+        _panel["base"] = overlay
+        _panel["frame"] = overlay.copy()
+        _panel["lines"] = None
+    return _panel["base"]
  
  
 def draw_overlay(name, lines):
-    w, h = 360, 140
-    overlay = np.zeros((h, w, 3), dtype=np.uint8)
-    overlay[:] = (35, 35, 35)
- 
-    # title
-    title = "Vandalytics"
-    (txt_w, txt_h), _ = cv2.getTextSize(title, cv2.FONT_HERSHEY_SIMPLEX, 0.9, 2)
-    tx = max(8, (w - txt_w) // 2)
-    ty = 24
-    cv2.putText(overlay, title, (tx, ty), cv2.FONT_HERSHEY_SIMPLEX, 0.9, (0, 0,255), 2, cv2.LINE_AA)
-    cv2.line(overlay, (8, ty + 6), (w - 8, ty + 6), (60, 60, 60), 1)
- 
-    # tats lines below title
-    y0, dy = ty + 22, 22
-    for i, line in enumerate(lines):
-        y = y0 + i * dy
-        cv2.putText(overlay, line, (10, y), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (230, 230, 230), 1, cv2.LINE_AA)
- 
-    cv2.imshow(name, overlay)
+    base = panel_base()
+    if lines != _panel["lines"]:
+        overlay = _panel["frame"]
+        np.copyto(overlay, base)
+ 
+        # stats lines below title
+        y0, dy = 24 + 22, 22
+        for i, line in enumerate(lines):
+            y = y0 + i * dy
+            sprites.draw(overlay, line, (10, y), (230, 230, 230), cv2.FONT_HERSHEY_SIMPLEX, 0.6, 1)
+ 
+        cv2.imshow(name, overlay)
+        _panel["lines"] = list(lines)
     cv2.waitKey(1)
  
  
-def write_csv(round_num, avg_offset, max_offset, std_dev, shots, tip, file_path=CSV_FILE):
-    exists = os.path.isfile(file_path)
-    with open(file_path, "a", newline="", encoding="utf-8") as f:
-        w = csv.writer(f)
-        if not exists:
-            w.writerow(["Timestamp", "Round", "AvgOffset", "MaxOffset", "StdDev", "Shots", "Tip"])
-        w.writerow([time.strftime("%Y-%m-%d %H:%M:%S"), round_num, round(avg_offset, 1), max_offset, round(std_dev, 1), shots, tip])
+def ui_box(w, h):
+    # round-end UI strip: centred, 20% wide, 5% tall, 5% down from the top
+    ui_w, ui_h = int(w * 0.2), int(h * 0.05)
+    return w // 2 - ui_w // 2, int(h * 0.05), ui_w, ui_h
+ 
+ 
+class CoachState:
+    """Shot / round tracking shared by the live loop and offline analysis."""
+ 
+    def __init__(self, args, store=None, telemetry=None, lifetime=None, player=None):
+        self.args = args
+        self.store = store
+        self.telemetry = telemetry
+        # optional PlayerClassifier; frames only count with a player in view
+        self.player = player
+        self.last_seen = float("-inf")
+        self.smooth = None
+        self.vertical_buf = deque(maxlen=args.smooth_frames)
+        self.last_shot_time = float("-inf")
+        self.last_ui_brightness = None
+        # streaming stats of shot offsets; the round's are reset at round end
+        self.round_shots = 0
+        self.round_stats = RunningStats()
+        self.session_stats = RunningStats()
+        self.lifetime = lifetime
+        self.round_num = 0
+        self.tip = "No data yet"
+ 
+    def step(self, offset, brightness, ui_b, now, seen=None):
+        # detection only; returns ("shot", smooth) / ("round", None) events for apply()
+        # seen: the player classifier's verdict for this frame, None without one
+        events = []
+        if seen:
+            self.last_seen = now
+        counting = seen is None or now - self.last_seen <= PLAYER_HOLD
+        if offset is not None and counting:
+            self.vertical_buf.append(offset)
+            smooth = sum(self.vertical_buf) / len(self.vertical_buf)
+        else:
+            smooth = None
+        self.smooth = smooth
+ 
+        # shot detection (brightness spike)
+        if brightness > self.args.shot_threshold and (now - self.last_shot_time) > self.args.shot_cooldown:
+            self.last_shot_time = now
+            if counting:
+                events.append(("shot", smooth))
+ 
+        # round-end detection via small UI region brightness change
+        if self.last_ui_brightness is not None and abs(ui_b - self.last_ui_brightness) > self.args.round_ui_threshold:
+            events.append(("round", None))
+            self.vertical_buf.clear()
+        self.last_ui_brightness = ui_b
+        return events
+ 
+    def apply(self, events, now=None):
+        # now: timestamp logged with the rows (offline: clip time), default wall time
+        now = time.time() if now is None else now
+        for kind, value in events:
+            if kind == "shot":
+                self.round_shots += 1
+                if value is not None:
+                    for stats in (self.round_stats, self.session_stats, self.lifetime):
+                        if stats is not None:
+                            stats.add(value)
+                if self.store is not None:
+                    self.store.shot(now, self.round_num + 1, value)
+                if self.telemetry is not None:
+                    self.telemetry.event("shot", round=self.round_num + 1, offset=value)
+                print(f"SHOT @ offset={value if value is not None else 'N/A'}")
+            elif kind == "round":
+                self.end_round(now)
+ 
+    def end_round(self, now=None):
+        self.round_num += 1
+        stats = self.round_stats
+        if stats.count:
+            avg, mx, sd, shots = stats.mean, stats.max_abs, stats.std, stats.count
+            if avg > 5:
+                self.tip = "Raise your crosshair slightly next round"
+            elif avg < -5:
+                self.tip = "Lower your crosshair slightly next round"
+            else:
+                self.tip = "Crosshair height is on point!"
+            if self.store is not None:
+                self.store.round(time.time() if now is None else now, self.round_num, round(avg, 1), mx, round(sd, 1), shots, self.tip)
+            if self.telemetry is not None:
+                self.telemetry.event("round", round=self.round_num, avg_offset=round(avg, 1), max_offset=mx,
+                                     std_dev=round(sd, 1), shots=shots, tip=self.tip,
+                                     p50=round(stats.quantile(0.5), 1), p90=round(stats.quantile(0.9), 1))
+            print(f"=== ROUND {self.round_num} === Avg={avg:.1f}px, Shots={shots} Tip={self.tip}")
+        self.round_shots = 0
+        stats.reset()
+ 
+    def overlay_lines(self):
+        buf = self.vertical_buf
+        avg_disp = f"{(sum(buf) / len(buf)):.1f}px" if buf else "N/A"
+        lines = [f"Round: {self.round_num}", f"Avg Offset: {avg_disp}", f"Shots: {self.round_shots}"]
+        stats = self.round_stats
+        if stats.count:
+            lines.append(f"p50/p90/p99: {stats.quantile(0.5):.0f} / {stats.quantile(0.9):.0f} / {stats.quantile(0.99):.0f}px")
+        else:
+            lines.append("p50/p90/p99: N/A")
+        session = self.session_stats
+        if session.count:
+            lines.append(f"Session: {session.mean:.1f} +/- {session.std:.1f}px ({session.count})")
+        else:
+            lines.append("Session: N/A")
+        lines.append(f"Tip: {self.tip}")
+        return lines
+ 
+    def summary(self):
+        # session and lifetime shot-offset stats, for the end of a run
+        lines = []
+        for label, stats in (("Session", self.session_stats), ("Lifetime", self.lifetime)):
+            if stats is not None and stats.count:
+                lines.append(f"{label}: {stats.count} shots, mean {stats.mean:.1f}px, sd {stats.std:.1f}px, "
+                             f"p50 {stats.quantile(0.5):.1f} p90 {stats.quantile(0.9):.1f} p99 {stats.quantile(0.99):.1f}px")
+        return "\n".join(lines)
+ 
+ 
+# ---------- offline analysis of recorded clips ----------
+ 
+def clip_info(path, fps=60.0):
+    # (frame_count, fps) of a video file or a directory of PNG frames
+    if os.path.isdir(path):
+        return len(png_frames(path)), fps
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise SystemExit(f"cannot open {path}")
+    count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    fps = cap.get(cv2.CAP_PROP_FPS) or fps
+    cap.release()
+    return count, fps
+ 
+ 
+def clip_start(path, count, fps):
+    # wall time of the clip's first frame: a video's mtime is when recording
+    # stopped, a PNG directory's first frame was written when it started
+    if os.path.isdir(path):
+        frames = png_frames(path)
+        return os.path.getmtime(frames[0]) if frames else os.path.getmtime(path)
+    return os.path.getmtime(path) - count / fps
+
+
+def png_frames(path):
+    return sorted(os.path.join(path, f) for f in os.listdir(path) if f.lower().endswith(".png"))
+ 
+ 
+def iter_frames(path, start, stop, fps):
+    # yields (index, clip time in seconds, BGR frame) for frames [start, stop)
+    if os.path.isdir(path):
+        for i, f in enumerate(png_frames(path)[start:stop], start):
+            frame = cv2.imread(f, cv2.IMREAD_COLOR)
+            if frame is not None:
+                yield i, i / fps, frame
+        return
+    cap = cv2.VideoCapture(path)
+    if start:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+    i = start
+    try:
+        while stop is None or i < stop:
+            ok, frame = cap.read()
+            if not ok:
+                break
+            yield i, i / fps, frame
+            i += 1
+    finally:
+        cap.release()
+ 
+ 
+def measure(frame, crop_ratio):
+    # centre-crop gray and UI-strip brightness of one full BGR frame
+    h, w = frame.shape[:2]
+    bounds = {"left": 0, "top": 0, "width": w, "height": h}
+    c = center_region(bounds, int(min(w, h) * crop_ratio))
+    gray = cv2.cvtColor(frame[c["top"]:c["top"] + c["height"], c["left"]:c["left"] + c["width"]], cv2.COLOR_BGR2GRAY)
+    u = region(bounds, *ui_box(w, h))
+    ui = frame[u["top"]:u["top"] + u["height"], u["left"]:u["left"] + u["width"]]
+    ui_b = float(np.mean(cv2.cvtColor(ui, cv2.COLOR_BGR2GRAY))) if ui.size > 0 else 0.0
+    return gray, ui_b
+ 
+ 
+def analyse_frame(state, t, gray, ui_b):
+    # one centre crop through the detector and the player check into CoachState
+    if gray.size == 0:
+        return state.step(None, 0.0, ui_b, t, None)
+    seen = state.player.in_view(gray) if state.player is not None else None
+    return state.step(DETECTORS[state.args.detector](gray), float(np.mean(gray)), ui_b, t, seen)
+ 
+ 
+def analyse_chunk(job):
+    # runs in a pool worker; returns the chunk's events tagged with clip time
+    path, start, stop, fps, args = job
+    # replay a short lead-in so smoothing, shot cooldown and the UI baseline
+    # carry across the chunk boundary exactly as in one serial pass
+    warmup = max(args.smooth_frames, int(args.shot_cooldown * fps) + 1)
+    state = CoachState(args, player=load_player(args))
+    events = []
+    for i, t, frame in iter_frames(path, max(0, start - warmup), stop, fps):
+        found = analyse_frame(state, t, *measure(frame, args.crop_ratio))
+        if i >= start:
+            events.extend((t, kind, value) for kind, value in found)
+    return events
+ 
+ 
+def open_store(args):
+    mirror = {"rounds": args.csv} if args.csv else None
+    return SessionStore(args.db, "coach", mirror)
+
+
+def load_lifetime(args):
+    return streaming_stats.load(args.lifetime) if args.lifetime else None
+
+
+def load_player(args):
+    return PlayerClassifier.load(args.player_model, args.player_threshold) if args.player_model else None
+
+
+def save_lifetime(args, state):
+    if args.lifetime and state.lifetime is not None:
+        streaming_stats.save(state.lifetime, args.lifetime)
+ 
+ 
+def run_offline(args):
+    if args.detector == "color":
+        raise SystemExit("--detector color calibrates on the live screen; use edges or template with --input")
+    count, fps = clip_info(args.input, args.fps)
+    chunk = max(1, int(args.chunk_seconds * fps))
+    starts = list(range(0, max(count, 1), chunk))
+    # the last chunk reads to the end, frame counts from containers are often short
+    jobs = [(args.input, s, s + chunk if s + chunk < count else None, fps, args) for s in starts]
+    print(f"Analysing {args.input}: {count} frames @ {fps:.1f} fps in {len(jobs)} chunks")
+ 
+    t0 = time.time()
+    # rows are stamped with when they happened in the recording, not now
+    start = clip_start(args.input, count, fps)
+    store = open_store(args)
+    state = CoachState(args, store, lifetime=load_lifetime(args))
+    workers = min(args.workers or os.cpu_count() or 1, len(jobs))
+    try:
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = pool.map(analyse_chunk, jobs)
+                for events in results:
+                    for t, kind, value in events:
+                        state.apply([(kind, value)], start + t)
+        else:
+            for job in jobs:
+                for t, kind, value in analyse_chunk(job):
+                    state.apply([(kind, value)], start + t)
+    finally:
+        store.close()
+        save_lifetime(args, state)
+    print(f"Done: {state.round_num} rounds in {time.time() - t0:.1f}s")
+    if state.summary():
+        print(state.summary())
  
  
 def main():
@@ -94,15 +383,42 @@ def main():
     parser.add_argument("--round-ui-threshold", type=int, default=140)
     parser.add_argument("--smooth-frames", type=int, default=7)
     parser.add_argument("--show-overlay", type=int, default=1)
+    parser.add_argument("--frame-interval", type=float, default=0.0, help="Minimum seconds between screen grabs (0 = as fast as possible)")
+    parser.add_argument("--stats-interval", type=float, default=0.0, help="Print pipeline latency/queue counters every N seconds (0 = on exit only)")
+    parser.add_argument("--bus", help="Read frames from this shared-memory frame bus instead of capturing the screen")
+    parser.add_argument("--detector", choices=list(DETECTORS) + ["color"], default="edges",
+                        help="Crosshair offset detector: Canny + largest contour, FFT template matching, or the calibrated colour mask")
+    parser.add_argument("--color-file", default=color_lut.COLOR_FILE, help="Crosshair colour calibration used by --detector color")
+    parser.add_argument("--recalibrate", action="store_true", help="Relearn the crosshair colour from the first frames")
+    parser.add_argument("--db", default=DB_FILE, help="SQLite session log for shots and rounds")
+    parser.add_argument("--csv", default=CSV_FILE, help="Also append finished rounds to this CSV file ('' to disable)")
+    parser.add_argument("--log-frames", action="store_true", help="Log every analysed frame's offset to the session database")
+    parser.add_argument("--player-model", help="Player classifier from player_classifier.py; only frames with a player in view count. "
+                        "The bundled training images are promo/map art, not gameplay crops: retrain on real crops first")
+    parser.add_argument("--player-threshold", type=float, help="Player probability a frame needs (default: the model's own)")
+    parser.add_argument("--lifetime", default=LIFETIME_FILE, help="File the all-time shot stats are kept in ('' to disable)")
+    parser.add_argument("--telemetry", help="Stream offsets, shots and rounds to the dashboard hub at HOST:PORT")
+    parser.add_argument("--input", help="Analyse a recorded video file or PNG directory headlessly instead of the screen")
+    parser.add_argument("--fps", type=float, default=60.0, help="Frame rate of a PNG directory (videos use their own)")
+    parser.add_argument("--chunk-seconds", type=float, default=60.0, help="Clip length handed to each offline worker")
+    parser.add_argument("--workers", type=int, default=0, help="Offline worker processes (0 = one per CPU)")
     args = parser.parse_args()
  
-    try:
-        import mss
-    except Exception:
-        raise SystemExit("mss is required; install with: pip install mss")
+    if args.input:
+        run_offline(args)
+        return
+ 
+    bus = open_bus(args.bus)
+    if bus is not None:
+        monitor = bus.monitor
+    else:
+        try:
+            import mss
+        except Exception:
+            raise SystemExit("mss is required; install with: pip install mss")
  
-    sct = mss.mss()
-    monitor = sct.monitors[args.monitor] if 0 <= args.monitor < len(sct.monitors) else sct.monitors[1]
+        with mss.mss() as sct:
+            monitor = sct.monitors[args.monitor] if 0 <= args.monitor < len(sct.monitors) else sct.monitors[1]
  
     # screen size (used for UI crop position)
     try:
@@ -118,94 +434,75 @@ def main():
     if args.show_overlay:
         cv2.namedWindow(window_name, cv2.WINDOW_NORMAL)
         cv2.moveWindow(window_name, 10, 10)
-        cv2.resizeWindow(window_name, 360, 140)
- 
-    vertical_buf = deque(maxlen=args.smooth_frames)
-    last_shot_time = 0
-    shot_offsets = []
-    round_num = 0
-    last_ui_brightness = None
-    tip = "No data yet"
- 
-    ROUND_END_W = int(SCREEN_W * 0.2)
-    ROUND_END_H = int(SCREEN_H * 0.05)
+        cv2.resizeWindow(window_name, PANEL_W, PANEL_H)
+ 
+    store = open_store(args)
+    telemetry = TelemetryClient(args.telemetry, "coach") if args.telemetry else None
+    state = CoachState(args, store, telemetry, load_lifetime(args), load_player(args))
+    color = color_lut.ColorDetector(args.color_file, recalibrate=args.recalibrate) if args.detector == "color" else None
+    _, ui_top, ui_w, ui_h = ui_box(SCREEN_W, SCREEN_H)
+ 
+    def make_capture():
+        # runs on the capture thread; mss handles can't cross threads
+        capture = BusCapture(bus) if bus is not None else RegionCapture(mss.mss(), monitor)
+        capture.add_center("crop", crop_size)
+        capture.add("ui", monitor["width"] // 2 - ui_w // 2, ui_top, ui_w, ui_h)
+ 
+        def grab():
+            if not capture.new_frame():
+                return None
+            bgra = capture.grab("crop")
+            if bgra is None:
+                return None
+            gray = cv2.cvtColor(bgra, cv2.COLOR_BGRA2GRAY)
+            ui_gray = capture.gray("ui")
+            ui_b = float(np.mean(ui_gray)) if ui_gray is not None else 0.0
+            # the colour mask needs the crop itself; bus frames get overwritten
+            return gray, ui_b, time.time(), bgra.copy() if color is not None else None
+        return grab
+ 
+    def analyse(item):
+        gray, ui_b, now, bgra = item
+        offset = color.detect_offset(bgra) if color is not None else DETECTORS[args.detector](gray)
+        seen = state.player.in_view(gray) if state.player is not None else None
+        state.apply(state.step(offset, float(np.mean(gray)), ui_b, now, seen))
+        if args.log_frames:
+            store.frame(now, offset, state.smooth)
+        if telemetry is not None:
+            telemetry.offset(state.smooth)
+        return state.overlay_lines()
+ 
+    pipeline = Pipeline(make_capture, analyse, interval=args.frame_interval).start()
+    last_stats = time.time()
  
     try:
         while True:
-            s = sct.grab(monitor)
-            frame = np.array(s)
-            if frame.shape[2] == 4:
-                frame = cv2.cvtColor(frame, cv2.COLOR_BGRA2BGR)
- 
-            h, w = frame.shape[:2]
-            cx, cy = w // 2, h // 2
-            half = crop_size // 2
-            crop = frame[max(0, cy - half):min(h, cy + half), max(0, cx - half):min(w, cx + half)]
-            if crop.size == 0:
-                time.sleep(0.05)
-                continue
- 
-            gray = cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY)
- 
-            offset = detect_offset(gray)
-            if offset is not None:
-                vertical_buf.append(offset)
-                smooth = sum(vertical_buf) / len(vertical_buf)
-            else:
-                smooth = None
- 
-            # shot detection (brightness spike)
-            brightness = float(np.mean(gray))
-            now = time.time()
-            if brightness > args.shot_threshold and (now - last_shot_time) > args.shot_cooldown:
-                last_shot_time = now
-                shot_offsets.append(smooth)
-                print(f"SHOT @ offset={smooth if smooth is not None else 'N/A'}")
- 
-            # round-end detection via small UI region brightness change
-            rx = cx - ROUND_END_W // 2
-            ry = int(SCREEN_H * 0.05)
-            if 0 <= ry < h:
-                ui = frame[ry:ry + ROUND_END_H, max(0, rx):min(w, rx + ROUND_END_W)]
-                if ui.size > 0:
-                    ui_gray = cv2.cvtColor(ui, cv2.COLOR_BGR2GRAY)
-                    ui_b = float(np.mean(ui_gray))
-                else:
-                    ui_b = 0.0
-            else:
-                ui_b = 0.0
- 
-            if last_ui_brightness is not None and abs(ui_b - last_ui_brightness) > args.round_ui_threshold:
-                # round ended
-                round_num += 1
-                valid = [s for s in shot_offsets if s is not None]
-                if valid:
-                    avg = sum(valid) / len(valid)
-                    mx = max(abs(x) for x in valid)
-                    sd = statistics.stdev(valid) if len(valid) > 1 else 0.0
-                    if avg > 5:
-                        tip = "Raise your crosshair slightly next round"
-                    elif avg < -5:
-                        tip = "Lower your crosshair slightly next round"
-                    else:
-                        tip = "Crosshair height is on point!"
-                    write_csv(round_num, avg, mx, sd, len(valid), tip)
-                    print(f"=== ROUND {round_num} === Avg={avg:.1f}px, Shots={len(valid)} Tip={tip}")
-                shot_offsets = []
-                vertical_buf.clear()
- 
-            last_ui_brightness = ui_b
- 
-            # overlay
-            if args.show_overlay:
-                avg_disp = f"{(sum(vertical_buf) / len(vertical_buf)):.1f}px" if vertical_buf else "N/A"
-                stats = [f"Round: {round_num}", f"Avg Offset: {avg_disp}", f"Shots: {len(shot_offsets)}", f"Tip: {tip}"]
-                draw_overlay(window_name, stats)
+            item = pipeline.latest()
+            if item is None:
+                time.sleep(0.001)
+            elif args.show_overlay:
+                with pipeline.render_timer():
+                    draw_overlay(window_name, item[2])
+                startup.first_frame("coach")
  
             if cv2.waitKey(1) & 0xFF == ord('q'):
                 break
  
+            if args.stats_interval and time.time() - last_stats >= args.stats_interval:
+                print(pipeline.summary())
+                last_stats = time.time()
+ 
     finally:
+        pipeline.stop()
+        store.close()
+        save_lifetime(args, state)
+        if telemetry is not None:
+            telemetry.close()
+        print(pipeline.summary())
+        if state.summary():
+            print(state.summary())
+        if bus is not None:
+            bus.close()
         try:
             cv2.destroyAllWindows()
         except Exception:
@@ -214,5 +511,4 @@ def main():
  
 if __name__ == '__main__':
     main()
- 
  
\ No newline at end of file
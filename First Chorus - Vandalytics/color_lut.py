@@ -0,0 +1,192 @@
+import argparse
+import json
+import time
+
+import cv2
+import numpy as np
+
+# Colour-based crosshair detection.
+# Valorant crosshairs are one colour the player picks, so after calibration a
+# pixel either has that colour or it doesn't. Calibration compares HSV
+# histograms of the crop's few centre columns (the crosshair's vertical arms
+# are always there) with bands of columns just beside them. A bright bin that
+# is far more common in the centre gets a vote; walls and floors span both
+# and cancel out, and bins voted for in at least half the frames are kept, so
+# a muzzle flash or a wall passing through the centre doesn't count. Those
+# bins are baked into a lookup table over 15-bit BGR (5 bits a channel): a
+# frame's mask is a few integer ops on the packed BGRA pixels and one table
+# lookup, and the vertical position comes from the mask's row projection
+# instead of contour tracing. Bright walls and sky are not the crosshair's
+# hue/saturation, so they stay out of the mask.
+
+COLOR_FILE = "crosshair_color.json"
+H_BINS, S_BINS, V_BINS = 30, 16, 16
+CALIBRATION_FRAMES = 30
+STRIP = 0.08          # half-width of the searched centre columns, as a fraction of the crop
+CORE = 2              # half-width in px of the columns calibration treats as crosshair
+MIN_SHARE = 0.01      # share of the core pixels a bin needs to be kept
+MIN_RATIO = 4.0       # how much more common in the core than beside it
+MIN_VALUE = 64        # darker bins are outlines / shadow, never the crosshair
+MIN_PIXELS = 6        # fewer mask pixels than this means no crosshair
+
+
+def _bgr(crop):
+    return cv2.cvtColor(crop, cv2.COLOR_BGRA2BGR) if crop.shape[2] == 4 else crop
+
+
+def _strip(width):
+    half = max(2, int(width * STRIP))
+    return width // 2 - half, width // 2 + half + 1
+
+
+def hsv_histogram(hsv):
+    return cv2.calcHist([hsv], [0, 1, 2], None, [H_BINS, S_BINS, V_BINS], [0, 180, 0, 256, 0, 256])
+
+
+class Calibration:
+    """Collects core / side HSV histograms and picks the crosshair bins."""
+
+    def __init__(self, frames=CALIBRATION_FRAMES):
+        self.frames = frames
+        self.seen = 0
+        self.votes = np.zeros((H_BINS, S_BINS, V_BINS), dtype=np.int32)
+
+    @property
+    def done(self):
+        return self.seen >= self.frames
+
+    def add(self, crop):
+        hsv = cv2.cvtColor(_bgr(crop), cv2.COLOR_BGR2HSV)
+        c = hsv.shape[1] // 2
+        x0, x1 = _strip(hsv.shape[1])
+        core = hsv_histogram(np.ascontiguousarray(hsv[:, c - CORE:c + CORE + 1]))
+        # beside the centre, past the arms' width: two bands of STRIP columns
+        side = np.zeros_like(core)
+        for band in (hsv[:, max(0, 2 * x0 - c):x0], hsv[:, x1:2 * x1 - c]):
+            if band.size:
+                side += hsv_histogram(np.ascontiguousarray(band))
+        core /= max(core.sum(), 1)
+        side /= max(side.sum(), 1)
+        self.votes += (core >= MIN_SHARE) & (core >= MIN_RATIO * side)
+        self.seen += 1
+
+    def bins(self):
+        # (H_BINS, S_BINS, V_BINS) bool of the crosshair's colours
+        bright = np.arange(V_BINS) * (256 // V_BINS) >= MIN_VALUE
+        return (self.votes * 2 >= max(self.seen, 1)) & bright[None, None, :]
+
+
+class ColorLut:
+    """Crosshair mask and offset from a table of the calibrated colours."""
+
+    def __init__(self, bins):
+        self.bins = np.asarray(bins, dtype=bool)
+        # HSV bin of the centre of every 5-bit BGR cell
+        levels = (np.arange(32, dtype=np.uint8) << 3) | 4
+        b, g, r = np.meshgrid(levels, levels, levels, indexing="ij")
+        cells = np.stack([b, g, r], axis=-1).reshape(-1, 1, 3)
+        hsv = cv2.cvtColor(cells, cv2.COLOR_BGR2HSV).reshape(-1, 3).astype(np.intp)
+        hi = hsv[:, 0] * H_BINS // 180
+        si = hsv[:, 1] * S_BINS // 256
+        vi = hsv[:, 2] * V_BINS // 256
+        # indexed by b << 10 | g << 5 | r
+        self.table = self.bins[hi, si, vi].astype(np.uint8)
+
+    @property
+    def empty(self):
+        return not self.bins.any()
+
+    def mask(self, crop):
+        # uint8 0/1 mask of crosshair-coloured pixels in a BGRA or BGR crop
+        if crop.shape[2] == 3:
+            crop = cv2.cvtColor(crop, cv2.COLOR_BGR2BGRA)
+        px = np.ascontiguousarray(crop).view(np.uint32)[..., 0]
+        # little-endian BGRA: b in bits 0-7, g in 8-15, r in 16-23
+        idx = ((px << 7) & 0x7C00) | ((px >> 6) & 0x3E0) | ((px >> 19) & 0x1F)
+        return self.table[idx]
+
+    def detect_offset(self, crop):
+        # row centroid of the mask in the centre columns, px from the crop centre
+        x0, x1 = _strip(crop.shape[1])
+        rows = self.mask(crop[:, x0:x1]).sum(axis=1, dtype=np.int64)
+        total = rows.sum()
+        if total < MIN_PIXELS:
+            return None
+        return float(rows @ np.arange(len(rows))) / total - crop.shape[0] // 2
+
+    def save(self, path=COLOR_FILE):
+        with open(path, "w") as f:
+            json.dump({"bins": np.argwhere(self.bins).tolist()}, f)
+
+    @classmethod
+    def load(cls, path=COLOR_FILE):
+        with open(path) as f:
+            picked = json.load(f)["bins"]
+        bins = np.zeros((H_BINS, S_BINS, V_BINS), dtype=bool)
+        for h, s, v in picked:
+            bins[h, s, v] = True
+        return cls(bins)
+
+
+class ColorDetector:
+    """ColorLut that calibrates itself on the first frames when no file exists."""
+
+    def __init__(self, path=COLOR_FILE, frames=CALIBRATION_FRAMES, recalibrate=False):
+        self.path = path
+        self.lut = None
+        self.calibration = None
+        if not recalibrate:
+            try:
+                self.lut = ColorLut.load(path)
+            except (OSError, ValueError, KeyError):
+                pass
+        if self.lut is None:
+            self.calibration = Calibration(frames)
+            print(f"Calibrating crosshair colour over {frames} frames; keep the crosshair on screen")
+
+    def detect_offset(self, crop):
+        if self.lut is None:
+            self.calibration.add(crop)
+            if not self.calibration.done:
+                return None
+            self.lut = ColorLut(self.calibration.bins())
+            if self.lut.empty:
+                print("Crosshair colour calibration found nothing; trying again")
+                self.calibration = Calibration(self.calibration.frames)
+                self.lut = None
+                return None
+            if self.path:
+                self.lut.save(self.path)
+            print(f"Crosshair colour calibrated ({int(self.lut.bins.sum())} HSV bins)")
+        return self.lut.detect_offset(crop)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Calibrate the crosshair colour from the centre of the screen")
+    parser.add_argument("--monitor", type=int, default=1)
+    parser.add_argument("--crop-size", type=int, default=250)
+    parser.add_argument("--frames", type=int, default=CALIBRATION_FRAMES)
+    parser.add_argument("--interval", type=float, default=0.1, help="Seconds between calibration grabs")
+    parser.add_argument("--output", default=COLOR_FILE)
+    args = parser.parse_args()
+
+    import mss
+
+    from capture import RegionCapture
+
+    with mss.mss() as sct:
+        capture = RegionCapture(sct, sct.monitors[args.monitor])
+        capture.add_center("crop", args.crop_size)
+        calibration = Calibration(args.frames)
+        while not calibration.done:
+            calibration.add(capture.grab("crop"))
+            time.sleep(args.interval)
+    lut = ColorLut(calibration.bins())
+    if lut.empty:
+        raise SystemExit("No crosshair colour stood out; move over a plainer background and try again")
+    lut.save(args.output)
+    print(f"Saved {int(lut.bins.sum())} crosshair colour bins to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,146 +2,152 @@ import argparse
 import time
 import cv2
 import numpy as np
-import mss
-import win32gui
-import win32con
-import ctypes
 
-ctypes.windll.user32.SetProcessDPIAware()
-user32 = ctypes.windll.user32
-
-SCREEN_WIDTH = user32.GetSystemMetrics(0)
-SCREEN_HEIGHT = user32.GetSystemMetrics(1)
+import startup
+from capture import BusCapture, RegionCapture, open_bus
+from change_detect import ChangeDetector
+from overlay import Compositor, open_window, screen_size
+from pipeline import Pipeline
 
 WINDOW_NAME = "Crosshair Overlay"
 
+def detect_offset(gray, threshold=200, min_area=10):
+    # vertical offset (px) from the crop centre of the largest bright blob
+    _, thresh = cv2.threshold(gray, threshold, 255, cv2.THRESH_BINARY)
+    contours, _ = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    if not contours:
+        return None
+    largest = max(contours, key=cv2.contourArea)
+    if cv2.contourArea(largest) <= min_area:  # filter noise
+        return None
+    M = cv2.moments(largest)
+    if M["m00"] == 0:
+        return None
+    return int(M["m01"] / M["m00"]) - gray.shape[0] // 2
+
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--monitor", type=int, default=1)
     parser.add_argument("--crop-size", type=int, default=250)
     parser.add_argument("--shot-threshold", type=int, default=180)
     parser.add_argument("--shot-cooldown", type=float, default=0.1)
+    parser.add_argument("--bus", help="Read frames from this shared-memory frame bus instead of capturing the screen")
+    parser.add_argument("--change-threshold", type=float, default=6.0, help="Max thumbnail change (0-255) treated as a static crop; 0 always reruns detection")
+    parser.add_argument("--max-skip", type=int, default=10, help="Rerun detection after this many skipped frames in a row")
+    parser.add_argument("--stats-interval", type=float, default=0.0, help="Print pipeline latency/queue counters every N seconds (0 = on exit only)")
     args = parser.parse_args()
 
-    sct = mss.mss()
-    monitor = sct.monitors[args.monitor]
+    bus = open_bus(args.bus)
+    if bus is not None:
+        monitor = bus.monitor
+    else:
+        import mss
 
-    cv2.namedWindow(WINDOW_NAME, cv2.WINDOW_NORMAL)
-    cv2.setWindowProperty(WINDOW_NAME, cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
+        with mss.mss() as sct:
+            monitor = sct.monitors[args.monitor]
 
-    hwnd = win32gui.FindWindow(None, WINDOW_NAME)
+    screen_width, screen_height = screen_size()
+    open_window(WINDOW_NAME)
 
-    win32gui.SetWindowLong(
-        hwnd,
-        win32con.GWL_EXSTYLE,
-        win32gui.GetWindowLong(hwnd, win32con.GWL_EXSTYLE)
-        | win32con.WS_EX_LAYERED
-        | win32con.WS_EX_TOPMOST
-        | win32con.WS_EX_TRANSPARENT
-    )
+    center_x = monitor["width"] // 2
+    center_y = monitor["height"] // 2
 
-    win32gui.SetLayeredWindowAttributes(
-        hwnd,
-        0x000000,
-        0,
-        win32con.LWA_COLORKEY
-    )
+    def make_capture():
+        # runs on the capture thread; mss handles can't cross threads
+        if bus is not None:
+            capture = BusCapture(bus)
+        else:
+            import mss
 
-    last_shot_time = 0
-    crop_size = args.crop_size
+            capture = RegionCapture(mss.mss(), monitor)
+        capture.add_center("crop", args.crop_size)
+        return lambda: capture.gray("crop") if capture.new_frame() else None
 
-    # --- smoothing state ---
+    # --- analysis state (analysis thread only) ---
+    last_shot_time = 0
     smoothed_offset = 0
     last_valid_offset = 0
     alpha = 0.25   # lower = smoother
 
-    print("Overlay running — ESC to quit")
-
-    while True:
-
-        start_time = time.time()
-
-        screenshot = sct.grab(monitor)
-        frame = np.array(screenshot)
-
-        if frame.shape[2] == 4:
-            frame = cv2.cvtColor(frame, cv2.COLOR_BGRA2BGR)
-
-        h, w = frame.shape[:2]
-        center_x = w // 2
-        center_y = h // 2
-
-        half = crop_size // 2
-        left = max(0, center_x - half)
-        top = max(0, center_y - half)
-        right = min(w, center_x + half)
-        bottom = min(h, center_y + half)
+    # reuse the last result while the crop is unchanged
+    detector = ChangeDetector(args.change_threshold, args.max_skip)
+    offset = None
+    brightness = 0.0
 
-        center_crop = frame[top:bottom, left:right]
-        overlay = np.zeros((SCREEN_HEIGHT, SCREEN_WIDTH, 3), dtype=np.uint8)
-
-        offset = None
-
-        if center_crop.size != 0:
-            gray = cv2.cvtColor(center_crop, cv2.COLOR_BGR2GRAY)
-
-            _, thresh = cv2.threshold(gray, 200, 255, cv2.THRESH_BINARY)
-            contours, _ = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-
-            if contours:
-                largest = max(contours, key=cv2.contourArea)
-
-                if cv2.contourArea(largest) > 10:  # filter noise
-                    M = cv2.moments(largest)
-                    if M["m00"] != 0:
-                        cy = int(M["m01"] / M["m00"])
-                        offset = (top + cy) - center_y
+    def analyse(gray):
+        nonlocal last_shot_time, smoothed_offset, last_valid_offset, offset, brightness
 
+        if detector.changed(gray):
+            # the crop is centred on the screen, so this is the offset from center_y
+            offset = detect_offset(gray)
             brightness = float(np.mean(gray))
-            current_time = time.time()
-            if brightness > args.shot_threshold and (current_time - last_shot_time) > args.shot_cooldown:
-                last_shot_time = current_time
-                print("SHOT detected!")
+
+        current_time = time.time()
+        if brightness > args.shot_threshold and (current_time - last_shot_time) > args.shot_cooldown:
+            last_shot_time = current_time
+            print("SHOT detected!")
 
         # --- smoothing ---
         if offset is not None:
             last_valid_offset = offset
 
         smoothed_offset = (alpha * last_valid_offset) + ((1 - alpha) * smoothed_offset)
+        return smoothed_offset
+
+    overlay = Compositor(WINDOW_NAME, screen_width, screen_height)
+
+    # small frame cap for smoothness
+    pipeline = Pipeline(make_capture, analyse, interval=0.005).start()
+    last_stats = time.time()
+
+    print("Overlay running — ESC to quit")
 
-        draw_y = int(center_y + smoothed_offset)
-
-        # --- draw vertical line ---
-        cv2.line(
-            overlay,
-            (center_x, center_y),
-            (center_x, draw_y),
-            (0, 0, 255),
-            3
-        )
-
-        # --- draw offset top left ---
-        cv2.putText(
-            overlay,
-            f"Offset: {int(smoothed_offset)} px",
-            (40, 60),
-            cv2.FONT_HERSHEY_SIMPLEX,
-            1,
-            (0, 0, 255),
-            2
-        )
-
-        cv2.imshow(WINDOW_NAME, overlay)
-
-        if cv2.waitKey(1) & 0xFF == 27:
-            break
-
-        # small frame cap for smoothness
-        elapsed = time.time() - start_time
-        if elapsed < 0.005:
-            time.sleep(0.005 - elapsed)
-
-    cv2.destroyAllWindows()
+    try:
+        while True:
+            item = pipeline.latest()
+            if item is None:
+                time.sleep(0.001)
+            else:
+                with pipeline.render_timer():
+                    shown_offset = item[2]
+
+                    draw_y = int(center_y + shown_offset)
+
+                    # --- draw vertical line ---
+                    overlay.line(
+                        (center_x, center_y),
+                        (center_x, draw_y),
+                        (0, 0, 255),
+                        3
+                    )
+
+                    # --- draw offset top left ---
+                    overlay.text(
+                        f"Offset: {int(shown_offset)} px",
+                        (40, 60),
+                        cv2.FONT_HERSHEY_SIMPLEX,
+                        1,
+                        (0, 0, 255),
+                        2
+                    )
+
+                    overlay.present()
+                    startup.first_frame("crosshair")
+
+            if cv2.waitKey(1) & 0xFF == 27:
+                break
+
+            if args.stats_interval and time.time() - last_stats >= args.stats_interval:
+                print(pipeline.summary())
+                print(detector.summary())
+                last_stats = time.time()
+    finally:
+        pipeline.stop()
+        print(pipeline.summary())
+        print(detector.summary())
+        if bus is not None:
+            bus.close()
+        cv2.destroyAllWindows()
 
 
 if __name__ == "__main__":
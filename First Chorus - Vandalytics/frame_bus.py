@@ -0,0 +1,280 @@
+import argparse
+import os
+import sys
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# Shared-memory frame bus: one process captures the monitor and publishes
+# BGRA frames into a small ring of slots; any number of analysers attach and
+# read the newest slot in place. Each slot carries a sequence number and a
+# monotonic timestamp. A reader's view stays valid until the producer comes
+# back round to that slot (SLOTS frames later), which valid(seq) can check.
+#
+# Readers subscribe with the box of the monitor they actually use and renew
+# the subscription every frame. The producer grabs only the union of the live
+# subscribers' boxes (the rest of a slot keeps whatever it held), captures
+# nothing while nobody is subscribed, and exits once nobody has been for
+# IDLE_EXIT seconds, so the dashboard can start it on demand.
+
+BUS_NAME = "vandalytics_frames"
+SLOTS = 4
+ALIGN = 64
+DEFAULT_FPS = 60.0
+LEASE_NS = 1_000_000_000   # a subscriber that hasn't renewed for this long is gone
+IDLE_EXIT = 10.0           # seconds without subscribers before run_producer returns
+
+# header layout (int64 words)
+H_SLOTS, H_HEIGHT, H_WIDTH, H_CHANNELS, H_LEFT, H_TOP, H_LATEST = range(7)
+HEADER_WORDS = 8
+# per-slot metadata: sequence number (0 while being written), timestamp ns,
+# then the x0, y0, x1, y1 box that was copied into the slot
+M_SEQ, M_TIME, M_X0, M_Y0, M_X1, M_Y1 = range(6)
+META_WORDS = 8
+# subscriber table: pid (0 = free), last renewal (monotonic ns), wanted box
+S_PID, S_BEAT, S_X0, S_Y0, S_X1, S_Y1 = range(6)
+SUBSCRIBERS = 8
+SUB_WORDS = 8
+
+
+def _aligned(n):
+    return (n + ALIGN - 1) // ALIGN * ALIGN
+
+
+def _slots_offset():
+    return _aligned(HEADER_WORDS * 8) + _aligned(SUBSCRIBERS * SUB_WORDS * 8)
+
+
+def _untrack(shm):
+    # on POSIX the resource tracker of an *attaching* process would unlink the
+    # segment when that process exits; only the producer should own it
+    if sys.platform != "win32":
+        try:
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(shm._name, "shared_memory")
+        except Exception:
+            pass
+
+
+class FrameBus:
+    def __init__(self, shm, owner):
+        self.shm = shm
+        self.owner = owner
+        self.header = np.ndarray((HEADER_WORDS,), dtype=np.int64, buffer=shm.buf)
+        self.subs = np.ndarray((SUBSCRIBERS, SUB_WORDS), dtype=np.int64, buffer=shm.buf,
+                               offset=_aligned(HEADER_WORDS * 8))
+        self.sub = None
+        self.slots = int(self.header[H_SLOTS])
+        self.shape = (int(self.header[H_HEIGHT]), int(self.header[H_WIDTH]), int(self.header[H_CHANNELS]))
+        frame_bytes = self.shape[0] * self.shape[1] * self.shape[2]
+        slot_bytes = _aligned(META_WORDS * 8) + _aligned(frame_bytes)
+        base = _slots_offset()
+        self.meta = []
+        self.frames = []
+        for i in range(self.slots):
+            off = base + i * slot_bytes
+            self.meta.append(np.ndarray((META_WORDS,), dtype=np.int64, buffer=shm.buf, offset=off))
+            self.frames.append(np.ndarray(self.shape, dtype=np.uint8, buffer=shm.buf, offset=off + _aligned(META_WORDS * 8)))
+
+    @property
+    def monitor(self):
+        # mss-style monitor dict for the captured area
+        h, w, _ = self.shape
+        return {"left": int(self.header[H_LEFT]), "top": int(self.header[H_TOP]), "width": w, "height": h}
+
+    @classmethod
+    def create(cls, monitor, name=BUS_NAME, channels=4, slots=SLOTS):
+        h, w = monitor["height"], monitor["width"]
+        size = _slots_offset() + slots * (_aligned(META_WORDS * 8) + _aligned(h * w * channels))
+        try:
+            shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            # left behind by a producer that died without cleaning up
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+            shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        header = np.ndarray((HEADER_WORDS,), dtype=np.int64, buffer=shm.buf)
+        header[:] = 0
+        header[H_SLOTS], header[H_HEIGHT], header[H_WIDTH], header[H_CHANNELS] = slots, h, w, channels
+        header[H_LEFT], header[H_TOP] = monitor["left"], monitor["top"]
+        del header
+        bus = cls(shm, owner=True)
+        bus.subs[:] = 0
+        return bus
+
+    @classmethod
+    def attach(cls, name=BUS_NAME, timeout=2.0):
+        # waits up to timeout for the producer to come up
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                shm = shared_memory.SharedMemory(name=name)
+                break
+            except FileNotFoundError:
+                if time.monotonic() >= deadline:
+                    raise
+                time.sleep(0.05)
+        _untrack(shm)
+        bus = cls(shm, owner=False)
+        while bus.slots == 0:
+            # segment exists but the producer hasn't written the header yet
+            if time.monotonic() >= deadline:
+                bus.close()
+                raise FileNotFoundError(f"frame bus {name} never initialised")
+            time.sleep(0.01)
+            bus = cls(shm, owner=False)
+        return bus
+
+    def publish(self, frame, timestamp_ns=None, box=None):
+        # box: where frame goes in the monitor (x0, y0, x1, y1); None = all of it
+        seq = int(self.header[H_LATEST]) + 1
+        meta = self.meta[seq % self.slots]
+        meta[M_SEQ] = 0
+        h, w, _ = self.shape
+        x0, y0, x1, y1 = box if box is not None else (0, 0, w, h)
+        np.copyto(self.frames[seq % self.slots][y0:y1, x0:x1], frame)
+        meta[M_TIME] = time.monotonic_ns() if timestamp_ns is None else timestamp_ns
+        meta[M_X0:M_Y1 + 1] = x0, y0, x1, y1
+        meta[M_SEQ] = seq
+        self.header[H_LATEST] = seq
+        return seq
+
+    def latest(self):
+        # (seq, timestamp_ns, frame view) of the newest complete frame, or None
+        seq = int(self.header[H_LATEST])
+        if seq == 0:
+            return None
+        meta = self.meta[seq % self.slots]
+        ts = int(meta[M_TIME])
+        if int(meta[M_SEQ]) != seq:
+            return None
+        return seq, ts, self.frames[seq % self.slots]
+
+    def wait_newer(self, seq, timeout=0.05):
+        # newest frame with a sequence number above seq, or None on timeout
+        deadline = time.monotonic() + timeout
+        while True:
+            item = self.latest()
+            if item is not None and item[0] > seq:
+                return item
+            if time.monotonic() >= deadline:
+                return None
+            time.sleep(0.0005)
+
+    def valid(self, seq):
+        # False once the producer has started overwriting that frame's slot
+        return int(self.meta[seq % self.slots][M_SEQ]) == seq
+
+    def covers(self, seq, box):
+        # True if frame seq was captured over all of box
+        meta = self.meta[seq % self.slots]
+        return (meta[M_X0] <= box[0] and meta[M_Y0] <= box[1]
+                and meta[M_X1] >= box[2] and meta[M_Y1] >= box[3])
+
+    # ---------- subscriptions ----------
+
+    def subscribe(self, box):
+        # ask the producer for the monitor-relative box (x0, y0, x1, y1); call
+        # again to change it, and renew() at least every LEASE_NS
+        if self.sub is None:
+            self.sub = self._claim()
+        entry = self.subs[self.sub]
+        entry[S_X0:S_Y1 + 1] = box
+        entry[S_BEAT] = time.monotonic_ns()
+
+    def _claim(self):
+        # free or expired entry; claims aren't atomic, so re-check after a moment
+        pid = os.getpid()
+        while True:
+            now = time.monotonic_ns()
+            free = [i for i, e in enumerate(self.subs) if e[S_PID] == 0 or now - e[S_BEAT] > LEASE_NS]
+            if not free:
+                raise RuntimeError(f"frame bus has {SUBSCRIBERS} subscribers already")
+            entry = self.subs[free[0]]
+            entry[S_BEAT] = now
+            entry[S_PID] = pid
+            time.sleep(0.001)
+            if entry[S_PID] == pid:
+                return free[0]
+
+    def renew(self):
+        if self.sub is not None:
+            self.subs[self.sub, S_BEAT] = time.monotonic_ns()
+
+    def unsubscribe(self):
+        if self.sub is not None:
+            self.subs[self.sub, S_PID] = 0
+            self.sub = None
+
+    def wanted(self):
+        # union of the live subscribers' boxes, or None while nobody is reading
+        now = time.monotonic_ns()
+        live = [e for e in self.subs
+                if e[S_PID] and now - e[S_BEAT] <= LEASE_NS and e[S_X1] > e[S_X0] and e[S_Y1] > e[S_Y0]]
+        if not live:
+            return None
+        h, w, _ = self.shape
+        x0 = max(0, min(int(e[S_X0]) for e in live))
+        y0 = max(0, min(int(e[S_Y0]) for e in live))
+        x1 = min(w, max(int(e[S_X1]) for e in live))
+        y1 = min(h, max(int(e[S_Y1]) for e in live))
+        return (x0, y0, x1, y1) if x1 > x0 and y1 > y0 else None
+
+    def close(self):
+        if self.header is not None:
+            self.unsubscribe()
+        # drop our views first, SharedMemory.close() refuses while they exist
+        self.header = self.meta = self.frames = self.subs = None
+        try:
+            self.shm.close()
+        except BufferError:
+            # a reader still holds a frame view; the mapping goes with the process
+            pass
+        if self.owner:
+            self.shm.unlink()
+
+
+def run_producer(name=BUS_NAME, monitor_index=1, fps=DEFAULT_FPS, idle_exit=IDLE_EXIT):
+    # idle_exit: seconds without subscribers (including right after start)
+    # before returning; 0 runs until interrupted
+    if fps <= 0:
+        raise ValueError("fps must be positive")
+    import mss
+
+    from capture import bgra_view, region
+
+    with mss.mss() as sct:
+        monitor = sct.monitors[monitor_index] if 0 <= monitor_index < len(sct.monitors) else sct.monitors[1]
+        bus = FrameBus.create(monitor, name)
+        interval = 1.0 / fps
+        idle_since = time.monotonic()
+        try:
+            while True:
+                t0 = time.perf_counter()
+                box = bus.wanted()
+                if box is not None:
+                    idle_since = time.monotonic()
+                    x0, y0, x1, y1 = box
+                    shot = sct.grab(region(monitor, x0, y0, x1 - x0, y1 - y0))
+                    bus.publish(bgra_view(shot), time.monotonic_ns(), box)
+                elif idle_exit and time.monotonic() - idle_since > idle_exit:
+                    break
+                wait = interval - (time.perf_counter() - t0)
+                if wait > 0:
+                    time.sleep(wait)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            bus.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Publish screen frames to shared memory")
+    parser.add_argument("--name", default=BUS_NAME)
+    parser.add_argument("--monitor", type=int, default=1)
+    parser.add_argument("--fps", type=float, default=DEFAULT_FPS, help="Capture rate cap")
+    parser.add_argument("--idle-exit", type=float, default=IDLE_EXIT, help="Exit after this many seconds without subscribers (0 = never)")
+    args = parser.parse_args()
+    run_producer(args.name, args.monitor, args.fps, args.idle_exit)
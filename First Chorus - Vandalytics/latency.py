@@ -0,0 +1,95 @@
+import threading
+import time
+
+# Click-to-photon instrumentation for the aim trainer.
+# Every timestamp is perf_counter_ns. For each trial we keep
+#   shown      when the target became current (old code started timing here)
+#   presented  when the first frame showing it had been handed to the window
+#   event      when the mouse-down reached the low-level hook (pynput's
+#              win32_event_filter, stamped there; the callback time elsewhere)
+#   callback   when pynput delivered the click to us
+# The player's reaction is event - presented; render and dispatch delay are
+# reported next to it instead of being counted against them. The hook is
+# stamped with perf_counter (QPC) rather than corrected by the message's own
+# time field, which is GetTickCount and only moves every 10-16 ms.
+
+WM_BUTTONDOWN = (0x0201, 0x0204, 0x0207, 0x020B)  # left, right, middle, x
+
+
+def now_ns():
+    return time.perf_counter_ns()
+
+
+class EventClock:
+    """OS timestamps of mouse-down events, via pynput's win32_event_filter."""
+
+    def __init__(self):
+        self.last_event_ns = None
+
+    def win32_filter(self, msg, data):
+        # called on the hook thread as the event arrives, before pynput
+        # queues it for the listener callback
+        if msg in WM_BUTTONDOWN:
+            self.last_event_ns = now_ns()
+        return True
+
+    def event_time(self, callback_ns):
+        t, self.last_event_ns = self.last_event_ns, None
+        return t if t is not None and t <= callback_ns else callback_ns
+
+
+class Trial:
+    def __init__(self, index, shown_ns):
+        self.index = index
+        self.shown_ns = shown_ns
+        self.presented_ns = None
+        self.event_ns = None
+        self.callback_ns = None
+
+    @property
+    def reaction_ms(self):
+        start = self.presented_ns if self.presented_ns is not None else self.shown_ns
+        return (self.event_ns - start) / 1e6
+
+    @property
+    def raw_ms(self):
+        # what a plain callback-minus-switch timer reports
+        return (self.callback_ns - self.shown_ns) / 1e6
+
+    @property
+    def render_ms(self):
+        return ((self.presented_ns or self.shown_ns) - self.shown_ns) / 1e6
+
+    @property
+    def dispatch_ms(self):
+        return (self.callback_ns - self.event_ns) / 1e6
+
+
+class TrialLog:
+    """Trials in order; hold lock to switch targets (hit() + begin()) or read which to draw."""
+
+    def __init__(self):
+        self.trials = []
+        self.current = None
+        self.lock = threading.RLock()
+
+    def begin(self, index, shown_ns=None):
+        with self.lock:
+            self.current = Trial(index, now_ns() if shown_ns is None else shown_ns)
+
+    def presented(self, index):
+        # first present after the target for trial `index` went up
+        with self.lock:
+            trial = self.current
+            if trial is not None and trial.index == index and trial.presented_ns is None:
+                trial.presented_ns = now_ns()
+
+    def hit(self, event_ns, callback_ns):
+        # None when no trial is open; the click is ignored
+        with self.lock:
+            trial, self.current = self.current, None
+            if trial is None:
+                return None
+            trial.event_ns, trial.callback_ns = event_ns, callback_ns
+            self.trials.append(trial)
+            return trial
@@ -1,14 +1,82 @@
 from fastapi import FastAPI, Request
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-import subprocess
+import multiprocessing
+import threading
+
+import frame_bus
+from stats_index import StatsIndex
+from telemetry import TELEMETRY_ADDRESS, TelemetryHub
+from worker_pool import WarmPool, preload_for
+from workers import UnknownToolError, WorkerLimitError, WorkerRegistry
 
 app = FastAPI()
 
 app.mount("/static", StaticFiles(directory="static"), name="static")
 templates = Jinja2Templates(directory="templates")
 
+# one screen capture shared by the analysers started from here; it runs only
+# while one of BUS_TOOLS does (the producer also exits by itself once nobody
+# has read from it for frame_bus.IDLE_EXIT seconds)
+BUS_TOOLS = {"coach"}
+bus_process = None
+bus_lock = threading.Lock()
+
+# round aggregates for /api/stats, topped up from the session database per request
+stats = StatsIndex()
+
+# live offsets / shots / rounds from the analysers, re-broadcast over SSE
+hub = TelemetryHub(TELEMETRY_ADDRESS)
+
+TOOLS = {
+    "aim": ["aim_train.py"],
+    "optimize": ["optimization.py"],
+    "coach": ["coach.py", "--bus", frame_bus.BUS_NAME, "--telemetry", TELEMETRY_ADDRESS],
+}
+
+# interpreters with the tools' third-party modules already imported, so
+# /run/* only has to hand over the script
+pool = WarmPool(modules=preload_for(argv[0] for argv in TOOLS.values()))
+
+workers = WorkerRegistry(TOOLS, pool=pool)
+
+def start_frame_bus():
+    global bus_process
+    with bus_lock:
+        if bus_process is None or not bus_process.is_alive():
+            bus_process = multiprocessing.Process(target=frame_bus.run_producer, args=(frame_bus.BUS_NAME, 1), daemon=True)
+            bus_process.start()
+
+def stop_frame_bus():
+    global bus_process
+    with bus_lock:
+        if bus_process is not None and bus_process.is_alive():
+            bus_process.terminate()
+            bus_process.join(timeout=2)
+        bus_process = None
+
+def bus_in_use():
+    return any(w.name in BUS_TOOLS for w in workers.running())
+
+@app.on_event("startup")
+def start_pool():
+    pool.start()
+
+@app.on_event("shutdown")
+def stop_tools():
+    workers.stop_all()
+    pool.close()
+    stop_frame_bus()
+
+@app.on_event("startup")
+async def start_telemetry():
+    await hub.start()
+
+@app.on_event("shutdown")
+async def stop_telemetry():
+    await hub.stop()
+
 @app.get("/", response_class=HTMLResponse)
 def dashboard(request: Request):
     return templates.TemplateResponse("app.html", {"request": request})
@@ -29,17 +97,77 @@ def logout():
         '<h2>Logged out. Redirecting to Home...</h2></body></html>'
     )
 
+def start_tool(name, message):
+    if name in BUS_TOOLS:
+        start_frame_bus()
+    try:
+        worker, started = workers.start(name)
+    except WorkerLimitError as e:
+        return JSONResponse({"status": "Too many tools running", "detail": str(e)}, status_code=429)
+    if not started:
+        message = message.replace("Started", "Already Running")
+    # replies right away; while state is "starting" startup_ms is still None
+    # and shows up on /workers/{name} once the tool is running
+    info = worker.info()
+    return {"status": message, "pid": worker.pid, "state": info["state"], "warm": info["warm"],
+            "startup_ms": info["startup_ms"], "status_url": f"/workers/{name}"}
+
 @app.post("/run/aim")
 def run_aim():
-    subprocess.Popen(["python", "aim_train.py"])
-    return {"status": "Aim Trainer Started"}
+    return start_tool("aim", "Aim Trainer Started")
 
 @app.post("/run/optimize")
 def run_optimize():
-    subprocess.Popen(["python", "optimization.py"])
-    return {"status": "Settings Optimizer Started"}
+    return start_tool("optimize", "Settings Optimizer Started")
 
 @app.post("/run/coach")
 def run_coach():
-    subprocess.Popen(["python", "coach.py"])
-    return {"status": "AI Coach Started"}
\ No newline at end of file
+    return start_tool("coach", "AI Coach Started")
+
+@app.get("/workers")
+def worker_status():
+    return workers.status()
+
+@app.get("/workers/{name}")
+def tool_status(name: str):
+    try:
+        return workers.status(name)
+    except UnknownToolError:
+        return JSONResponse({"status": f"Unknown tool {name}"}, status_code=404)
+
+@app.post("/workers/{name}/stop")
+def stop_tool(name: str):
+    try:
+        worker = workers.stop(name)
+    except UnknownToolError:
+        return JSONResponse({"status": f"Unknown tool {name}"}, status_code=404)
+    if name in BUS_TOOLS and not bus_in_use():
+        stop_frame_bus()
+    if worker is None:
+        return {"status": f"{name} not running"}
+    return {"status": f"{name} stopped", "worker": worker.info()}
+
+@app.get("/api/stats")
+def stats_summary(start: float = None, end: float = None):
+    stats.refresh()
+    return stats.summary(start, end)
+
+@app.get("/api/stats/sessions")
+def stats_sessions(limit: int = 50):
+    stats.refresh()
+    return stats.session_summaries(limit)
+
+@app.get("/api/stats/rolling")
+def stats_rolling(window: int = 20, start: float = None, end: float = None, points: int = 200):
+    stats.refresh()
+    return stats.rolling(max(1, window), start, end, points)
+
+@app.get("/api/stats/shots")
+def stats_shots(start: float = None, end: float = None, limit: int = 500):
+    stats.refresh()
+    return stats.shots_per_round(start, end, limit)
+
+@app.get("/api/live")
+def live(request: Request):
+    return StreamingResponse(hub.stream(request), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
\ No newline at end of file
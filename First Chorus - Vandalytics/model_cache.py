@@ -0,0 +1,159 @@
+import hashlib
+import http.client
+import os
+import shutil
+import sys
+import threading
+import urllib.request
+
+# Versioned local cache for downloaded model files.
+# Files live in one per-user directory (not the current working directory)
+# under <name>/<version>/, and every use re-checks their SHA-256: against the
+# pinned hash in MODELS when there is one, otherwise against the hash recorded
+# when the file was first downloaded. Downloads go to a temporary file and are
+# renamed into place only once verified, so a half-written model is never
+# picked up. Offline mode (--offline or VANDALYTICS_OFFLINE=1) never touches
+# the network and fails if the model is not already cached.
+
+MODELS = {
+    "pose_landmarker_lite": {
+        "version": "float16-1",
+        "file": "pose_landmarker_lite.task",
+        "url": "https://storage.googleapis.com/mediapipe-models/pose_landmarker/pose_landmarker_lite/float16/1/pose_landmarker_lite.task",
+        "sha256": None,  # pin here to reject anything else; None trusts the first download
+        "legacy": "pose_landmarker.task",  # where older versions of posture.py saved it
+    },
+}
+
+
+class ModelUnavailable(RuntimeError):
+    pass
+
+
+def cache_dir():
+    if os.environ.get("VANDALYTICS_MODELS"):
+        return os.environ["VANDALYTICS_MODELS"]
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+        return os.path.join(base, "Vandalytics", "models")
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, "vandalytics", "models")
+
+
+def offline_default():
+    return os.environ.get("VANDALYTICS_OFFLINE", "") not in ("", "0")
+
+
+def model_path(name):
+    spec = MODELS[name]
+    return os.path.join(cache_dir(), name, spec["version"], spec["file"])
+
+
+def _sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _expected(name):
+    pinned = MODELS[name]["sha256"]
+    if pinned:
+        return pinned
+    try:
+        with open(model_path(name) + ".sha256") as f:
+            return f.read().split()[0]
+    except (OSError, IndexError):
+        return None
+
+
+def cached(name):
+    # verified path of the cached model, or None
+    path = model_path(name)
+    if not os.path.isfile(path):
+        return None
+    expected = _expected(name)
+    if expected is None or _sha256(path) != expected:
+        return None
+    return path
+
+
+def _install(name, src, move):
+    # verify src and put it in the cache; returns the cached path
+    path = model_path(name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    digest = _sha256(src)
+    pinned = MODELS[name]["sha256"]
+    if pinned and digest != pinned:
+        raise ModelUnavailable(f"{name}: checksum mismatch ({digest}, expected {pinned})")
+    if not pinned:
+        print(f"{name}: no pinned checksum, trusting this copy ({digest}); "
+              f"pin it in model_cache.MODELS to reject anything else")
+    tmp = path + ".tmp"
+    if move:
+        os.replace(src, tmp)
+    else:
+        shutil.copyfile(src, tmp)
+    with open(path + ".sha256", "w") as f:
+        f.write(f"{digest}  {MODELS[name]['file']}\n")
+    os.replace(tmp, path)
+    return path
+
+
+def fetch(name):
+    spec = MODELS[name]
+    path = model_path(name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    part = f"{path}.{os.getpid()}.part"
+    try:
+        urllib.request.urlretrieve(spec["url"], part)
+        return _install(name, part, move=True)
+    except (OSError, http.client.HTTPException) as e:
+        raise ModelUnavailable(f"{name}: download failed: {e!r}")
+    finally:
+        if os.path.exists(part):
+            os.remove(part)
+
+
+def resolve(name, offline=None, download=True):
+    """Verified local path for name.
+
+    A model saved by an older version in the working directory is adopted
+    into the cache. Otherwise it is downloaded unless offline, or unless
+    download is False, in which case ModelUnavailable is raised.
+    """
+    path = cached(name)
+    if path is not None:
+        return path
+    legacy = MODELS[name].get("legacy")
+    if legacy and os.path.isfile(legacy):
+        try:
+            return _install(name, legacy, move=False)
+        except ModelUnavailable:
+            pass
+    if offline if offline is not None else offline_default():
+        raise ModelUnavailable(f"{name} is not in the model cache ({model_path(name)}) and offline mode is on")
+    if not download:
+        raise ModelUnavailable(f"{name} is not cached yet")
+    return fetch(name)
+
+
+class BackgroundFetch:
+    """resolve() on a thread, so a tool can keep its window responsive."""
+
+    def __init__(self, name, offline=None):
+        self.name = name
+        self.path = None
+        self.error = None
+        self.done = threading.Event()
+        threading.Thread(target=self._run, args=(offline,), daemon=True).start()
+
+    def _run(self, offline):
+        # done is always set, whatever fails, so nobody waits on it forever
+        try:
+            self.path = resolve(self.name, offline)
+        except Exception as e:
+            self.error = e if isinstance(e, ModelUnavailable) else ModelUnavailable(f"{self.name}: {e!r}")
+        finally:
+            self.done.set()
@@ -0,0 +1,160 @@
+import cv2
+import numpy as np
+
+# Dirty-rectangle compositor for the fullscreen colour-keyed overlays.
+# One persistent black buffer is kept for the window. Each frame the tool
+# records its draw calls; present() diffs them against the previous frame,
+# clears only the rectangles of shapes that went away or moved, redraws the
+# shapes touching those rectangles, and skips cv2.imshow when nothing changed.
+# The win32 window helpers import pywin32 on first use, so importing this
+# module has no side effects.
+
+AA_PAD = 2  # slack for anti-aliasing / rounded line caps
+
+
+def screen_size():
+    # physical pixels, so the overlay lines up on scaled displays
+    import ctypes
+
+    user32 = ctypes.windll.user32
+    user32.SetProcessDPIAware()
+    return user32.GetSystemMetrics(0), user32.GetSystemMetrics(1)
+
+
+def open_window(name):
+    # fullscreen, always-on-top, click-through window; black is transparent
+    import win32con
+    import win32gui
+
+    cv2.namedWindow(name, cv2.WINDOW_NORMAL)
+    cv2.setWindowProperty(name, cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
+    hwnd = win32gui.FindWindow(None, name)
+    win32gui.SetWindowLong(
+        hwnd,
+        win32con.GWL_EXSTYLE,
+        win32gui.GetWindowLong(hwnd, win32con.GWL_EXSTYLE)
+        | win32con.WS_EX_LAYERED
+        | win32con.WS_EX_TOPMOST
+        | win32con.WS_EX_TRANSPARENT
+    )
+    win32gui.SetLayeredWindowAttributes(hwnd, 0x000000, 0, win32con.LWA_COLORKEY)
+    return hwnd
+
+
+def force_topmost(hwnd):
+    import win32con
+    import win32gui
+
+    win32gui.SetWindowPos(
+        hwnd,
+        win32con.HWND_TOPMOST,
+        0, 0, 0, 0,
+        win32con.SWP_NOMOVE | win32con.SWP_NOSIZE | win32con.SWP_NOACTIVATE | win32con.SWP_SHOWWINDOW
+    )
+
+
+def _box(points, grow):
+    xs = [p[0] for p in points]
+    ys = [p[1] for p in points]
+    g = grow + AA_PAD
+    return min(xs) - g, min(ys) - g, max(xs) + g + 1, max(ys) + g + 1
+
+
+def _overlaps(a, b):
+    return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+
+
+def _pt(p):
+    return int(p[0]), int(p[1])
+
+
+def _color(c):
+    return tuple(int(v) for v in c)
+
+
+class Compositor:
+    """Persistent overlay buffer with per-shape dirty tracking."""
+
+    def __init__(self, window, width, height):
+        self.window = window
+        self.buffer = np.zeros((height, width, 3), dtype=np.uint8)
+        self.ops = []
+        self.shown = {}
+        self.presented = 0
+        self.skipped = 0
+
+    # ---- draw calls: recorded now, rasterised in present() ----
+
+    def line(self, p1, p2, color, thickness=1):
+        p1, p2 = _pt(p1), _pt(p2)
+        self.ops.append(("line", (p1, p2, _color(color), thickness), _box((p1, p2), thickness)))
+
+    def arrowed_line(self, p1, p2, color, thickness=1, tip_length=0.1):
+        p1, p2 = _pt(p1), _pt(p2)
+        tip = int(np.hypot(p2[0] - p1[0], p2[1] - p1[1]) * tip_length)
+        self.ops.append(("arrow", (p1, p2, _color(color), thickness, tip_length), _box((p1, p2), thickness + tip)))
+
+    def circle(self, center, radius, color, thickness=1):
+        c = _pt(center)
+        r = int(radius)
+        box = _box(((c[0] - r, c[1] - r), (c[0] + r, c[1] + r)), max(thickness, 0))
+        self.ops.append(("circle", (c, r, _color(color), thickness), box))
+
+    def rectangle(self, p1, p2, color, thickness=1):
+        p1, p2 = _pt(p1), _pt(p2)
+        self.ops.append(("rect", (p1, p2, _color(color), thickness), _box((p1, p2), max(thickness, 0))))
+
+    def text(self, text, org, font, scale, color, thickness=1):
+        org = _pt(org)
+        (w, h), baseline = cv2.getTextSize(text, font, scale, thickness)
+        box = _box(((org[0], org[1] - h), (org[0] + w, org[1] + baseline)), thickness)
+        self.ops.append(("text", (text, org, font, scale, _color(color), thickness), box))
+
+    # ---- frame submission ----
+
+    def present(self):
+        # returns True if the window was updated this frame
+        ops = {(kind, args): box for kind, args, box in self.ops}
+        order = [(kind, args) for kind, args, _ in self.ops]
+        self.ops = []
+        if self.presented and ops.keys() == self.shown.keys():
+            self.skipped += 1
+            return False
+
+        h, w = self.buffer.shape[:2]
+        cleared = []
+        for key, box in self.shown.items():
+            if key not in ops:
+                x0, y0, x1, y1 = max(0, box[0]), max(0, box[1]), min(w, box[2]), min(h, box[3])
+                if x0 < x1 and y0 < y1:
+                    self.buffer[y0:y1, x0:x1] = 0
+                    cleared.append(box)
+
+        # new shapes, plus kept shapes that a cleared rectangle cut into
+        for key in order:
+            box = ops[key]
+            if key not in self.shown or any(_overlaps(box, c) for c in cleared):
+                self._draw(*key)
+
+        self.shown = ops
+        cv2.imshow(self.window, self.buffer)
+        self.presented += 1
+        return True
+
+    def _draw(self, kind, args):
+        buf = self.buffer
+        if kind == "line":
+            p1, p2, color, thickness = args
+            cv2.line(buf, p1, p2, color, thickness)
+        elif kind == "arrow":
+            p1, p2, color, thickness, tip_length = args
+            cv2.arrowedLine(buf, p1, p2, color, thickness, tipLength=tip_length)
+        elif kind == "circle":
+            c, r, color, thickness = args
+            cv2.circle(buf, c, r, color, thickness)
+        elif kind == "rect":
+            p1, p2, color, thickness = args
+            cv2.rectangle(buf, p1, p2, color, thickness)
+        elif kind == "text":
+            text, org, font, scale, color, thickness = args
+            cv2.putText(buf, text, org, font, scale, color, thickness)
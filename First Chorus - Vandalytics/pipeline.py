@@ -0,0 +1,181 @@
+import threading
+import time
+from collections import deque
+
+# Capture -> analysis -> render pipeline for the live tools.
+# Capture and analysis run on their own threads; rendering stays on the
+# caller's (main) thread because HighGUI windows belong to the thread that
+# created them. Stages are linked by small drop-oldest queues, so a slow stage
+# never makes the others wait and the renderer always gets the newest result.
+
+
+class LatestQueue:
+    """Bounded queue that discards the oldest item instead of blocking."""
+
+    def __init__(self, maxsize=1):
+        self.items = deque(maxlen=maxsize)
+        self.cond = threading.Condition()
+        self.dropped = 0
+        self.closed = False
+
+    def put(self, item):
+        with self.cond:
+            if len(self.items) == self.items.maxlen:
+                self.dropped += 1
+            self.items.append(item)
+            self.cond.notify()
+
+    def get(self, timeout=None):
+        # oldest queued item, or None on timeout / close
+        with self.cond:
+            if not self.cond.wait_for(lambda: self.items or self.closed, timeout):
+                return None
+            return self.items.popleft() if self.items else None
+
+    def latest(self):
+        # newest item without waiting; anything older is dropped as stale
+        with self.cond:
+            if not self.items:
+                return None
+            self.dropped += len(self.items) - 1
+            item = self.items.pop()
+            self.items.clear()
+            return item
+
+    def depth(self):
+        return len(self.items)
+
+    def close(self):
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+
+
+class StageStats:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.last = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.last = seconds
+        self.max = max(self.max, seconds)
+
+    def snapshot(self):
+        avg = self.total / self.count if self.count else 0.0
+        return {"count": self.count, "avg_ms": avg * 1000, "last_ms": self.last * 1000, "max_ms": self.max * 1000}
+
+
+class Pipeline:
+    """Runs make_capture()'s grab function and analyse() on worker threads.
+
+    make_capture is called on the capture thread (mss handles are per-thread)
+    and must return a function producing one item per call, or None to skip.
+    analyse(item) runs on the analysis thread; its return value is what
+    latest() hands to the renderer.
+    """
+
+    def __init__(self, make_capture, analyse, interval=0.0, depth=1):
+        self.make_capture = make_capture
+        self.analyse = analyse
+        self.interval = interval
+        self.frames = LatestQueue(depth)
+        self.results = LatestQueue(depth)
+        self.stages = {name: StageStats() for name in ("capture", "analysis", "render", "age")}
+        self.running = False
+        self.error = None
+        self.threads = []
+
+    def start(self):
+        self.running = True
+        for target in (self._capture_loop, self._analysis_loop):
+            t = threading.Thread(target=target, daemon=True)
+            t.start()
+            self.threads.append(t)
+        return self
+
+    def stop(self):
+        self.running = False
+        self.frames.close()
+        self.results.close()
+        for t in self.threads:
+            t.join(timeout=1.0)
+
+    def _capture_loop(self):
+        try:
+            grab = self.make_capture()
+            seq = 0
+            while self.running:
+                t0 = time.perf_counter()
+                item = grab()
+                t1 = time.perf_counter()
+                self.stages["capture"].record(t1 - t0)
+                if item is not None:
+                    seq += 1
+                    self.frames.put((seq, t0, item))
+                wait = self.interval - (time.perf_counter() - t0)
+                if wait > 0:
+                    time.sleep(wait)
+        except Exception as e:
+            self.error = e
+            self.running = False
+            self.frames.close()
+
+    def _analysis_loop(self):
+        try:
+            while self.running:
+                frame = self.frames.get(timeout=0.1)
+                if frame is None:
+                    continue
+                seq, captured, item = frame
+                t0 = time.perf_counter()
+                result = self.analyse(item)
+                self.stages["analysis"].record(time.perf_counter() - t0)
+                self.results.put((seq, captured, result))
+        except Exception as e:
+            self.error = e
+            self.running = False
+            self.results.close()
+
+    def latest(self):
+        # (seq, capture time, result) of the newest analysed frame, or None;
+        # re-raises a worker failure on the render thread
+        if self.error is not None:
+            raise self.error
+        item = self.results.latest()
+        if item is not None:
+            self.stages["age"].record(time.perf_counter() - item[1])
+        return item
+
+    def render_timer(self):
+        return _Timer(self.stages["render"])
+
+    def stats(self):
+        out = {name: s.snapshot() for name, s in self.stages.items()}
+        out["queues"] = {
+            "frames": {"depth": self.frames.depth(), "dropped": self.frames.dropped},
+            "results": {"depth": self.results.depth(), "dropped": self.results.dropped},
+        }
+        return out
+
+    def summary(self):
+        st = self.stats()
+        parts = [f"{name} {st[name]['avg_ms']:.2f}/{st[name]['max_ms']:.2f}ms" for name in self.stages]
+        q = st["queues"]
+        parts.append(f"dropped frames={q['frames']['dropped']} results={q['results']['dropped']}")
+        return "pipeline avg/max: " + ", ".join(parts)
+
+
+class _Timer:
+    def __init__(self, stats):
+        self.stats = stats
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.stats.record(time.perf_counter() - self.t0)
@@ -0,0 +1,227 @@
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+# Player / non-player classifier for the coach's centre crop.
+# Features are HOG (unsigned gradient orientations, 8px cells, 2x2-cell
+# blocks, L2-Hys) of the crop scaled to 64x64 gray, computed with numpy, and
+# the model is a logistic regression on the standardised features.
+# It is trained from the submission's labelled images
+# (Backend/trainingpics = players, Backend/nonplayer = none), augmented with
+# random square crops, flips and brightness changes since there are only a
+# few dozen of them; accuracy is checked with cross-validation grouped by
+# source image. The model is a few KB and a crop takes well under a
+# millisecond, see `python player_classifier.py bench`.
+#
+# Domain gap: those images are promo art, agent renders and map/lobby shots
+# of ~300x170 px, not the 216 px centre crops of live gameplay the coach
+# feeds it, so the cross-validation figure says little about live accuracy.
+# Treat a model trained on them as a starting point and retrain on crops
+# saved from real rounds before trusting --player-model.
+
+MODEL_FILE = "player_model.npz"
+BACKEND = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "submissions",
+                       "First Chorus - Vandalytics", "Backend")
+PLAYER_DIR = os.path.join(BACKEND, "trainingpics")
+NONPLAYER_DIR = os.path.join(BACKEND, "nonplayer")
+IMAGE_EXTS = (".png", ".jpg", ".jpeg", ".webp", ".bmp")
+
+SIZE, CELL, BINS = 64, 8, 9
+THRESHOLD = 0.5
+CROP_BUDGET_MS = 1.0        # per crop
+MODEL_BUDGET_BYTES = 64 * 1024
+
+# cell of every pixel of a SIZE x SIZE crop, row-major
+_rows = np.arange(SIZE) // CELL
+_CELL_INDEX = _rows[:, None] * (SIZE // CELL) + _rows[None, :]
+
+
+def hog_features(grays):
+    """(N, D) float32 HOG features of a list of gray crops of any size."""
+    stack = np.stack([cv2.resize(g, (SIZE, SIZE), interpolation=cv2.INTER_AREA) for g in grays]).astype(np.float32)
+    gx = np.zeros_like(stack)
+    gy = np.zeros_like(stack)
+    gx[:, :, 1:-1] = stack[:, :, 2:] - stack[:, :, :-2]
+    gy[:, 1:-1, :] = stack[:, 2:, :] - stack[:, :-2, :]
+    mag = np.hypot(gx, gy)
+    # unsigned orientation, split linearly between the two nearest bins
+    pos = (np.arctan2(gy, gx) % np.pi) / (np.pi / BINS) - 0.5
+    lo = np.floor(pos)
+    frac = pos - lo
+    lo = lo.astype(np.intp) % BINS
+    hi = (lo + 1) % BINS
+
+    # one bincount over (crop, cell, bin) for the whole batch
+    n, cells = len(stack), SIZE // CELL
+    base = (np.arange(n)[:, None, None] * cells * cells + _CELL_INDEX) * BINS
+    hist = np.bincount((base + lo).ravel(), (mag * (1 - frac)).ravel(), n * cells * cells * BINS)
+    hist += np.bincount((base + hi).ravel(), (mag * frac).ravel(), n * cells * cells * BINS)
+    hist = hist.reshape(n, cells, cells, BINS)
+    blocks = np.concatenate([hist[:, :-1, :-1], hist[:, :-1, 1:], hist[:, 1:, :-1], hist[:, 1:, 1:]], axis=-1)
+    blocks /= np.sqrt((blocks ** 2).sum(axis=-1, keepdims=True) + 1e-6)
+    np.minimum(blocks, 0.2, out=blocks)
+    blocks /= np.sqrt((blocks ** 2).sum(axis=-1, keepdims=True) + 1e-6)
+    return blocks.reshape(n, -1).astype(np.float32)
+
+
+class PlayerClassifier:
+    """Logistic regression over HOG features of one crop."""
+
+    def __init__(self, weights, bias, mean, std, threshold=THRESHOLD):
+        self.weights = weights.astype(np.float32)
+        self.bias = float(bias)
+        self.mean = mean.astype(np.float32)
+        self.std = std.astype(np.float32)
+        self.threshold = threshold
+
+    def score(self, gray):
+        # player probability of the crop
+        z = float(((hog_features([gray])[0] - self.mean) / self.std) @ self.weights) + self.bias
+        return 1.0 / (1.0 + np.exp(-z))
+
+    def in_view(self, gray):
+        return bool(self.score(gray) >= self.threshold)
+
+    def save(self, path=MODEL_FILE):
+        np.savez_compressed(path, weights=self.weights, bias=self.bias, mean=self.mean, std=self.std,
+                            threshold=self.threshold, size=SIZE, cell=CELL, bins=BINS)
+
+    @classmethod
+    def load(cls, path=MODEL_FILE, threshold=None):
+        with np.load(path) as data:
+            if (int(data["size"]), int(data["cell"]), int(data["bins"])) != (SIZE, CELL, BINS):
+                raise ValueError(f"{path} was trained with different HOG settings; retrain it")
+            return cls(data["weights"], data["bias"], data["mean"], data["std"],
+                       float(data["threshold"]) if threshold is None else threshold)
+
+
+# ---------- training ----------
+
+def load_images(folder):
+    paths = sorted(os.path.join(folder, f) for f in os.listdir(folder) if f.lower().endswith(IMAGE_EXTS))
+    images = [cv2.imread(p, cv2.IMREAD_GRAYSCALE) for p in paths]
+    return [im for im in images if im is not None]
+
+
+def augment(rng, image, count):
+    # the centre square crop plus random square crops, flips and exposure
+    h, w = image.shape
+    side = min(h, w)
+    out = [image[(h - side) // 2:(h + side) // 2, (w - side) // 2:(w + side) // 2]]
+    for _ in range(count):
+        s = int(side * rng.uniform(0.5, 1.0))
+        y, x = int(rng.integers(0, h - s + 1)), int(rng.integers(0, w - s + 1))
+        crop = image[y:y + s, x:x + s]
+        if rng.random() < 0.5:
+            crop = crop[:, ::-1]
+        crop = cv2.convertScaleAbs(crop, alpha=rng.uniform(0.75, 1.25), beta=rng.uniform(-25, 25))
+        out.append(np.ascontiguousarray(crop))
+    return out
+
+
+def dataset(rng, players, nonplayers, count):
+    # features, labels and the source image of every sample
+    crops, labels, groups = [], [], []
+    source = 0
+    for label, images in ((1, players), (0, nonplayers)):
+        for image in images:
+            samples = augment(rng, image, count)
+            crops += samples
+            labels += [label] * len(samples)
+            groups += [source] * len(samples)
+            source += 1
+    return hog_features(crops), np.array(labels, dtype=np.float32), np.array(groups)
+
+
+def fit(x, y, l2=1e-2, steps=400, lr=0.5):
+    """Class-balanced L2 logistic regression by gradient descent."""
+    mean = x.mean(axis=0)
+    std = x.std(axis=0) + 1e-3
+    xs = (x - mean) / std
+    # each class carries half the total weight
+    sample_w = np.where(y == 1, 0.5 / max(y.sum(), 1), 0.5 / max((1 - y).sum(), 1))
+    w = np.zeros(x.shape[1], dtype=np.float64)
+    b = 0.0
+    for _ in range(steps):
+        p = 1.0 / (1.0 + np.exp(-(xs @ w + b)))
+        err = (p - y) * sample_w
+        w -= lr * (xs.T @ err + l2 * w)
+        b -= lr * err.sum()
+    return PlayerClassifier(w, b, mean, std)
+
+
+def cross_validate(x, y, groups, folds):
+    # accuracy with every source image's samples held out together
+    ids = np.unique(groups)
+    rng = np.random.default_rng(0)
+    rng.shuffle(ids)
+    correct = total = 0
+    for k in range(folds):
+        held = np.isin(groups, ids[k::folds])
+        model = fit(x[~held], y[~held])
+        z = ((x[held] - model.mean) / model.std) @ model.weights + model.bias
+        correct += int(((z >= 0) == (y[held] == 1)).sum())
+        total += int(held.sum())
+    return correct / max(total, 1)
+
+
+def train(args):
+    players, nonplayers = load_images(args.players), load_images(args.nonplayers)
+    if not players or not nonplayers:
+        raise SystemExit(f"need images in both {args.players} and {args.nonplayers}")
+    rng = np.random.default_rng(args.seed)
+    t0 = time.time()
+    x, y, groups = dataset(rng, players, nonplayers, args.augment)
+    print(f"{len(players)} player / {len(nonplayers)} non-player images -> {len(y)} samples, {x.shape[1]} features")
+    if args.folds > 1:
+        print(f"{args.folds}-fold accuracy (grouped by image): {cross_validate(x, y, groups, args.folds) * 100:.1f}%")
+    model = fit(x, y)
+    model.save(args.model)
+    print(f"Saved {args.model} ({os.path.getsize(args.model)} bytes) in {time.time() - t0:.1f}s")
+
+
+def bench(args):
+    model = PlayerClassifier.load(args.model)
+    size = os.path.getsize(args.model)
+    rng = np.random.default_rng(0)
+    crops = [rng.integers(0, 256, (args.crop_size, args.crop_size), dtype=np.uint8) for _ in range(64)]
+    failed = size > MODEL_BUDGET_BYTES
+    print(f"model {size} bytes (budget {MODEL_BUDGET_BYTES})  {'ok' if size <= MODEL_BUDGET_BYTES else 'OVER BUDGET'}")
+    # best of a few passes over the crops
+    best = None
+    for _ in range(5):
+        t0 = time.perf_counter()
+        for crop in crops:
+            model.score(crop)
+        ms = (time.perf_counter() - t0) * 1000 / len(crops)
+        best = ms if best is None else min(best, ms)
+    ok = best <= CROP_BUDGET_MS * args.scale
+    failed = failed or not ok
+    print(f"{best:.3f} ms/crop  (budget {CROP_BUDGET_MS * args.scale:.2f})  {'ok' if ok else 'OVER BUDGET'}")
+    sys.exit(1 if failed else 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train or benchmark the player / non-player crop classifier")
+    parser.add_argument("command", choices=["train", "bench"])
+    parser.add_argument("--model", default=MODEL_FILE)
+    parser.add_argument("--players", default=PLAYER_DIR, help="Folder of screenshots with a player in view")
+    parser.add_argument("--nonplayers", default=NONPLAYER_DIR, help="Folder of screenshots without one")
+    parser.add_argument("--augment", type=int, default=24, help="Random crops per training image")
+    parser.add_argument("--folds", type=int, default=5, help="Cross-validation folds (0 to skip)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--crop-size", type=int, default=216, help="Crop side used by bench (coach's default at 1080p)")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply the time budget, e.g. for slow machines")
+    args = parser.parse_args()
+    if args.command == "train":
+        train(args)
+    else:
+        bench(args)
+
+
+if __name__ == "__main__":
+    main()
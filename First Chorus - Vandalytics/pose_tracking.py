@@ -0,0 +1,132 @@
+import cv2
+import numpy as np
+
+# Helpers for posture.py's adaptive mode: run the pose model only as often as
+# the posture needs, on a downscaled crop around the person, and fill the
+# frames in between by extrapolating from the last two results.
+
+NOSE, LEFT_SHOULDER, RIGHT_SHOULDER = 0, 11, 12
+MAX_EXTRAPOLATE = 0.5   # furthest ahead of the newest result, in inference intervals
+
+
+def landmark_points(landmarks, box, frame_w, frame_h):
+    # normalised landmarks of a crop -> (N, 2) full-frame pixel coordinates
+    x0, y0, x1, y1 = box if box is not None else (0, 0, frame_w, frame_h)
+    pts = np.array([(lm.x, lm.y) for lm in landmarks], dtype=np.float32)
+    pts[:, 0] = x0 + pts[:, 0] * (x1 - x0)
+    pts[:, 1] = y0 + pts[:, 1] * (y1 - y0)
+    return pts
+
+
+def vertical_gap(points):
+    # shoulder midpoint minus nose height, as in the full-rate loop
+    torso_mid_y = (int(points[LEFT_SHOULDER, 1]) + int(points[RIGHT_SHOULDER, 1])) // 2
+    return torso_mid_y - int(points[NOSE, 1])
+
+
+class RateScheduler:
+    """Inference interval that backs off while the posture is clearly on one
+    side of the threshold and snaps back to full rate near it or on a change.
+    """
+
+    def __init__(self, threshold, margin=25, min_rate=2.0, max_rate=15.0, growth=1.5):
+        self.threshold = threshold
+        self.margin = margin
+        self.fast = 1.0 / max_rate
+        self.slow = 1.0 / min_rate
+        self.growth = growth
+        self.interval = self.fast
+        self.next_due = 0.0
+        self.state = None
+
+    def due(self, now):
+        return now >= self.next_due
+
+    def hurry(self):
+        self.interval = self.fast
+        self.next_due = 0.0
+
+    def update(self, gap, now):
+        state = None if gap is None else gap < self.threshold
+        if gap is None or state != self.state or abs(gap - self.threshold) < self.margin:
+            self.interval = self.fast
+        else:
+            self.interval = min(self.slow, self.interval * self.growth)
+        self.state = state
+        self.next_due = now + self.interval
+
+
+class RoiTracker:
+    """Crop box around the last detected person, downscaled for inference.
+
+    The box only moves once the person drifts out of its inner part or
+    changes size noticeably, so the model sees a steady view between calls.
+    """
+
+    def __init__(self, size=256, pad=0.35, search_size=320):
+        self.size = size
+        self.pad = pad
+        self.search_size = search_size
+        self.box = None
+
+    def reset(self):
+        self.box = None
+
+    def crop(self, frame):
+        # (inference image, box or None for the whole frame)
+        if self.box is None:
+            return _fit(frame, self.search_size), None
+        x0, y0, x1, y1 = self.box
+        return _fit(frame[y0:y1, x0:x1], self.size), self.box
+
+    def update(self, points, frame_shape):
+        h, w = frame_shape[:2]
+        (px0, py0), (px1, py1) = points.min(axis=0), points.max(axis=0)
+        bw, bh = px1 - px0, py1 - py0
+        if self.box is not None:
+            x0, y0, x1, y1 = self.box
+            mx, my = (x1 - x0) * 0.1, (y1 - y0) * 0.1
+            inside = px0 >= x0 + mx and py0 >= y0 + my and px1 <= x1 - mx and py1 <= y1 - my
+            # padded size the current box was made for
+            old_w, old_h = (x1 - x0) / (1 + 2 * self.pad), (y1 - y0) / (1 + 2 * self.pad)
+            steady = abs(bw - old_w) < 0.2 * old_w and abs(bh - old_h) < 0.2 * old_h
+            if inside and steady:
+                return
+        x0 = int(max(0, px0 - bw * self.pad))
+        y0 = int(max(0, py0 - bh * self.pad))
+        x1 = int(min(w, px1 + bw * self.pad))
+        y1 = int(min(h, py1 + bh * self.pad))
+        self.box = (x0, y0, x1, y1) if x1 - x0 >= 16 and y1 - y0 >= 16 else None
+
+
+class LandmarkInterpolator:
+    """Newest inference, carried forward between calls at the velocity of the
+    last two, so markers keep moving without lagging an interval behind."""
+
+    def __init__(self):
+        self.prev = None
+        self.last = None
+
+    def clear(self):
+        self.prev = self.last = None
+
+    def add(self, t, points):
+        self.prev, self.last = self.last, (t, points)
+
+    def at(self, t):
+        if self.last is None:
+            return None
+        if self.prev is None:
+            return self.last[1]
+        (t0, p0), (t1, p1) = self.prev, self.last
+        k = min(MAX_EXTRAPOLATE, max(0.0, (t - t1) / (t1 - t0))) if t1 > t0 else 0.0
+        return p1 + (p1 - p0) * k
+
+
+def _fit(img, size):
+    # downscale so the longer side is at most size
+    h, w = img.shape[:2]
+    scale = size / max(h, w)
+    if scale >= 1.0:
+        return img
+    return cv2.resize(img, (max(1, int(w * scale)), max(1, int(h * scale))), interpolation=cv2.INTER_AREA)
@@ -1,72 +1,406 @@
+import argparse
+import csv
 import cv2
 import time
 import os
-import urllib.request
+import threading
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
-from mediapipe.tasks.python.vision import pose_landmarker
-from mediapipe.tasks.python.vision.core import image as mp_image
-from mediapipe.tasks.python.core import base_options as base_options_lib
-from mediapipe.tasks.python.vision.core import vision_task_running_mode as running_mode_lib
 
-MODEL_PATH = "pose_landmarker.task"
-MODEL_URL = "https://storage.googleapis.com/mediapipe-models/pose_landmarker/pose_landmarker_lite/float16/1/pose_landmarker_lite.task"
+import model_cache
+import startup
+from pipeline import LatestQueue, StageStats
+from pose_tracking import (LEFT_SHOULDER, NOSE, RIGHT_SHOULDER, LandmarkInterpolator, RateScheduler, RoiTracker,
+                           landmark_points, vertical_gap)
 
-if not os.path.exists(MODEL_PATH):
-    urllib.request.urlretrieve(MODEL_URL, MODEL_PATH)
+POSE_MODEL = "pose_landmarker_lite"
 
-options = pose_landmarker.PoseLandmarkerOptions(
-    base_options=base_options_lib.BaseOptions(model_asset_path=MODEL_PATH),
-    running_mode=running_mode_lib.VisionTaskRunningMode.VIDEO,
-    num_poses=1
-)
+HUNCH_THRESHOLD = 90  # pixels
 
-landmarker = pose_landmarker.PoseLandmarker.create_from_options(options)
-cap = cv2.VideoCapture(0)
 
-HUNCH_THRESHOLD = 90  # pixels
+def wait_for_model(cap, offline):
+    # verified model path; while it downloads the webcam keeps showing
+    fetch = model_cache.BackgroundFetch(POSE_MODEL, offline)
+    while not fetch.done.wait(0.03):
+        ret, frame = cap.read()
+        if ret:
+            cv2.putText(frame, "DOWNLOADING POSE MODEL...", (20, 40),
+                        cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 3)
+            cv2.imshow("Posture Check", frame)
+        if cv2.waitKey(1) & 0xFF == ord('q'):
+            return None
+    if fetch.error is not None:
+        raise SystemExit(str(fetch.error))
+    return fetch.path
+
+
+def load_landmarker(model_path, live_callback=None):
+    # mediapipe takes a while to import, so it is only loaded here
+    from mediapipe.tasks.python.vision import pose_landmarker
+    from mediapipe.tasks.python.core import base_options as base_options_lib
+    from mediapipe.tasks.python.vision.core import vision_task_running_mode as running_mode_lib
+
+    mode = running_mode_lib.VisionTaskRunningMode
+    options = pose_landmarker.PoseLandmarkerOptions(
+        base_options=base_options_lib.BaseOptions(model_asset_path=model_path),
+        running_mode=mode.LIVE_STREAM if live_callback else mode.VIDEO,
+        num_poses=1,
+        result_callback=live_callback
+    )
+
+    return pose_landmarker.PoseLandmarker.create_from_options(options)
+
+
+def classify(vertical_gap):
+    if vertical_gap is None:
+        return "NO PERSON", (255, 255, 255)
+    if vertical_gap < HUNCH_THRESHOLD:
+        return "HUNCHING", (0, 0, 255)
+    return "GOOD POSTURE", (0, 255, 0)
+
+
+def run_adaptive(args, landmarker, cap, mp_image):
+    # pose model on a small crop, only as often as the posture needs
+    scheduler = RateScheduler(HUNCH_THRESHOLD, args.margin, args.min_rate, args.max_rate)
+    roi = RoiTracker(args.roi_size)
+    tracks = LandmarkInterpolator()
+    frames = inferences = 0
+    t_start = time.monotonic()
+    last_ts = -1
+
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames += 1
+        now = time.monotonic()
+
+        if scheduler.due(now):
+            img, box = roi.crop(frame)
+            rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+            ts = max(last_ts + 1, int(now * 1000))
+            last_ts = ts
+            result = landmarker.detect_for_video(mp_image.Image(mp_image.ImageFormat.SRGB, rgb), ts)
+            inferences += 1
+            if result.pose_landmarks:
+                points = landmark_points(result.pose_landmarks[0], box, frame.shape[1], frame.shape[0])
+                roi.update(points, frame.shape)
+                tracks.add(now, points)
+                scheduler.update(vertical_gap(points), now)
+            elif box is not None:
+                # lost them in the crop: look at the whole frame straight away
+                roi.reset()
+                scheduler.hurry()
+            else:
+                tracks.clear()
+                scheduler.update(None, now)
+
+        points = tracks.at(now)
+        posture_state, color = classify(vertical_gap(points) if points is not None else None)
+        if points is not None:
+            for i in (NOSE, LEFT_SHOULDER, RIGHT_SHOULDER):
+                cv2.circle(frame, (int(points[i, 0]), int(points[i, 1])), 5, color, -1)
+
+        cv2.putText(frame, posture_state, (20, 40),
+                    cv2.FONT_HERSHEY_SIMPLEX, 1, color, 3)
+
+        cv2.imshow("Posture Check", frame)
+        startup.first_frame("posture")
+
+        if cv2.waitKey(1) & 0xFF == ord('q'):
+            break
+
+    elapsed = max(time.monotonic() - t_start, 1e-6)
+    print(f"posture: {inferences} inferences for {frames} frames "
+          f"({inferences / elapsed:.1f}/s vs {frames / elapsed:.1f} fps)")
+
+
+class LivePosture:
+    """LIVE_STREAM inference: frames go in with detect_async, results come
+    back on mediapipe's thread. At most max_in_flight frames are being
+    processed at once; newer frames are simply not submitted until one is
+    done, so the model never works through a backlog of stale frames.
+    """
+
+    def __init__(self, max_in_flight=1):
+        self.max_in_flight = max_in_flight
+        self.lock = threading.Lock()
+        self.in_flight = {}       # timestamp_ms -> capture time
+        self.last_ts = -1
+        self.result = classify(None)
+        self.latency = StageStats()
+        self.submitted = 0
+        self.skipped = 0
+
+    def submit(self, landmarker, mp_image, frame, captured):
+        with self.lock:
+            if len(self.in_flight) >= self.max_in_flight:
+                self.skipped += 1
+                return
+            ts = max(self.last_ts + 1, int(captured * 1000))
+            self.last_ts = ts
+            self.in_flight[ts] = captured
+        self.submitted += 1
+        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        landmarker.detect_async(mp_image.Image(mp_image.ImageFormat.SRGB, rgb), ts)
+
+    def on_result(self, result, image, timestamp_ms):
+        # mediapipe's callback thread
+        gap = None
+        if result.pose_landmarks:
+            gap = vertical_gap(landmark_points(result.pose_landmarks[0], None, image.width, image.height))
+        state = classify(gap)
+        with self.lock:
+            captured = self.in_flight.pop(timestamp_ms, None)
+            self.result = state
+        if captured is not None:
+            self.latency.record(time.monotonic() - captured)
+
+    def summary(self):
+        st = self.latency.snapshot()
+        return (f"posture live: capture->state avg {st['avg_ms']:.1f}ms max {st['max_ms']:.1f}ms, "
+                f"{self.submitted} frames inferred, {self.skipped} skipped while busy")
+
+
+def read_camera(cap, frames, running):
+    # keeps only the newest frame; the display and the model never wait on the camera
+    while running.is_set():
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.put((time.monotonic(), frame))
+    frames.close()
+    running.clear()
+
+
+def run_live(args, cap, mp_image, model_path):
+    live = LivePosture(args.max_in_flight)
+    landmarker = load_landmarker(model_path, live.on_result)
+    frames = LatestQueue(1)
+    running = threading.Event()
+    running.set()
+    reader = threading.Thread(target=read_camera, args=(cap, frames, running), daemon=True)
+    reader.start()
+    last_report = time.monotonic()
 
-while True:
-    ret, frame = cap.read()
-    if not ret:
-        break
+    try:
+        while running.is_set():
+            item = frames.get(timeout=0.1)
+            if item is None:
+                continue
+            captured, frame = item
+            live.submit(landmarker, mp_image, frame, captured)
 
-    h, w, _ = frame.shape
-    rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-    mp_img = mp_image.Image(mp_image.ImageFormat.SRGB, np.asarray(rgb))
-    result = landmarker.detect_for_video(mp_img, int(time.time()*1000))
+            posture_state, color = live.result
+            cv2.putText(frame, posture_state, (20, 40),
+                        cv2.FONT_HERSHEY_SIMPLEX, 1, color, 3)
+            cv2.imshow("Posture Check", frame)
+            startup.first_frame("posture")
 
-    posture_state = "NO PERSON"
-    color = (255, 255, 255)
+            if args.stats_interval and time.monotonic() - last_report >= args.stats_interval:
+                print(live.summary())
+                last_report = time.monotonic()
 
-    if result.pose_landmarks:
-        l = result.pose_landmarks[0]
+            if cv2.waitKey(1) & 0xFF == ord('q'):
+                break
+    finally:
+        running.clear()
+        reader.join(timeout=1.0)
+        landmarker.close()
+        print(live.summary())
 
-        nose = l[0]
-        ls = l[11]
-        rs = l[12]
 
-        ny = int(nose.y * h)
-        lys = int(ls.y * h)
-        rys = int(rs.y * h)
+# ---------- offline analysis of recorded sessions ----------
 
-        torso_mid_y = (lys + rys) // 2
-        vertical_gap = torso_mid_y - ny
 
-        if vertical_gap < HUNCH_THRESHOLD:
-            posture_state = "HUNCHING"
-            color = (0, 0, 255)
+def analyse_segment(job):
+    # runs in a pool worker with its own landmarker; returns (t_ms, state)
+    # samples for frames [start, stop), timestamped by their place in the clip
+    path, start, stop, fps, sample_fps, model_path = job
+    from mediapipe.tasks.python.vision.core import image as mp_image
+
+    step = max(1, int(round(fps / sample_fps))) if sample_fps > 0 else 1
+    landmarker = load_landmarker(model_path)
+    cap = cv2.VideoCapture(path)
+    cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+    samples = []
+    i = start
+    try:
+        while stop is None or i < stop:
+            if (i - start) % step:
+                # skipped frames are only demuxed, not decoded
+                if not cap.grab():
+                    break
+                i += 1
+                continue
+            ret, frame = cap.read()
+            if not ret:
+                break
+            ts = int(i * 1000 / fps)
+            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            result = landmarker.detect_for_video(mp_image.Image(mp_image.ImageFormat.SRGB, rgb), ts)
+            gap = None
+            if result.pose_landmarks:
+                gap = vertical_gap(landmark_points(result.pose_landmarks[0], None, frame.shape[1], frame.shape[0]))
+            samples.append((ts, classify(gap)[0]))
+            i += 1
+    finally:
+        cap.release()
+        landmarker.close()
+    return samples
+
+
+def build_timeline(samples, end_ms):
+    # merge consecutive equal states into [start_ms, end_ms, state] intervals;
+    # each sample holds until the next one
+    timeline = []
+    for k, (ts, state) in enumerate(samples):
+        until = samples[k + 1][0] if k + 1 < len(samples) else max(end_ms, ts)
+        if timeline and timeline[-1][2] == state:
+            timeline[-1][1] = until
         else:
-            posture_state = "GOOD POSTURE"
-            color = (0, 255, 0)
+            timeline.append([ts, until, state])
+    return timeline
+
+
+def run_offline(args):
+    cap = cv2.VideoCapture(args.input)
+    if not cap.isOpened():
+        raise SystemExit(f"cannot open {args.input}")
+    count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    cap.release()
+
+    # resolved once here, not racing in every worker
+    try:
+        model_path = model_cache.resolve(POSE_MODEL, args.offline)
+    except model_cache.ModelUnavailable as e:
+        raise SystemExit(str(e))
+    segment = max(1, int(args.segment_seconds * fps))
+    starts = list(range(0, max(count, 1), segment))
+    # the last segment reads to the end, container frame counts are often short
+    jobs = [(args.input, s, s + segment if s + segment < count else None, fps, args.sample_fps, model_path) for s in starts]
+    workers = min(args.workers or os.cpu_count() or 1, len(jobs))
+    print(f"Analysing {args.input}: {count} frames @ {fps:.1f} fps in {len(jobs)} segments on {workers} workers")
+
+    t0 = time.time()
+    samples = []
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for part in pool.map(analyse_segment, jobs):
+                samples.extend(part)
+    else:
+        for job in jobs:
+            samples.extend(analyse_segment(job))
+
+    end_ms = int(max(count, 1) * 1000 / fps)
+    timeline = build_timeline(samples, end_ms)
+    total = sum(e - s for s, e, _ in timeline) or 1
+    for start_ms, stop_ms, state in timeline:
+        print(f"{start_ms / 1000:9.1f}s - {stop_ms / 1000:9.1f}s  {state}")
+    for state in ("GOOD POSTURE", "HUNCHING", "NO PERSON"):
+        share = sum(e - s for s, e, st in timeline if st == state) / total * 100
+        print(f"{state:13s} {share:5.1f}%")
+    print(f"Done in {time.time() - t0:.1f}s")
+
+    if args.timeline:
+        with open(args.timeline, "w", newline="", encoding="utf-8") as f:
+            w = csv.writer(f)
+            w.writerow(["start_s", "end_s", "state"])
+            w.writerows((round(s / 1000, 3), round(e / 1000, 3), st) for s, e, st in timeline)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Webcam posture check")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--live", action="store_true", help="Asynchronous LIVE_STREAM inference fed by a capture thread")
+    mode.add_argument("--adaptive", action="store_true", help="Infer on a tracked, downscaled crop at a rate that follows the posture")
+    parser.add_argument("--min-rate", type=float, default=2.0, help="Inferences per second while posture is clearly stable")
+    parser.add_argument("--max-rate", type=float, default=15.0, help="Inferences per second near the hunch threshold")
+    parser.add_argument("--margin", type=int, default=25, help="Pixels either side of HUNCH_THRESHOLD that count as near it")
+    parser.add_argument("--roi-size", type=int, default=256, help="Longest side of the crop handed to the model")
+    parser.add_argument("--input", help="Analyse a recorded video into a posture timeline instead of using the webcam")
+    parser.add_argument("--sample-fps", type=float, default=5.0, help="--input: frames analysed per second of video (0 = every frame)")
+    parser.add_argument("--segment-seconds", type=float, default=300.0, help="--input: video length handed to each worker")
+    parser.add_argument("--workers", type=int, default=0, help="--input: worker processes (0 = one per CPU)")
+    parser.add_argument("--timeline", help="--input: also write the intervals to this CSV file")
+    parser.add_argument("--offline", action="store_true", default=model_cache.offline_default(), help="Never download the model; fail if it is not cached")
+    parser.add_argument("--max-in-flight", type=int, default=1, help="--live: frames the model may be working on at once")
+    parser.add_argument("--stats-interval", type=float, default=0.0, help="--live: print latency every N seconds (0 = on exit only)")
+    args = parser.parse_args()
+
+    if args.input:
+        run_offline(args)
+        return
+
+    from mediapipe.tasks.python.vision.core import image as mp_image
+
+    cap = cv2.VideoCapture(0)
+    model_path = wait_for_model(cap, args.offline)
+    if model_path is None:
+        cap.release()
+        cv2.destroyAllWindows()
+        return
+
+    if args.live:
+        try:
+            run_live(args, cap, mp_image, model_path)
+        finally:
+            cap.release()
+            cv2.destroyAllWindows()
+        return
+
+    landmarker = load_landmarker(model_path)
+
+    if args.adaptive:
+        try:
+            run_adaptive(args, landmarker, cap, mp_image)
+        finally:
+            cap.release()
+            landmarker.close()
+            cv2.destroyAllWindows()
+        return
+
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+
+        h, w, _ = frame.shape
+        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        mp_img = mp_image.Image(mp_image.ImageFormat.SRGB, np.asarray(rgb))
+        result = landmarker.detect_for_video(mp_img, int(time.time()*1000))
+
+        gap = None
+        if result.pose_landmarks:
+            l = result.pose_landmarks[0]
+
+            nose = l[0]
+            ls = l[11]
+            rs = l[12]
+
+            ny = int(nose.y * h)
+            lys = int(ls.y * h)
+            rys = int(rs.y * h)
+
+            torso_mid_y = (lys + rys) // 2
+            gap = torso_mid_y - ny
+
+        posture_state, color = classify(gap)
+
+        cv2.putText(frame, posture_state, (20, 40),
+                    cv2.FONT_HERSHEY_SIMPLEX, 1, color, 3)
+
+        cv2.imshow("Posture Check", frame)
+        startup.first_frame("posture")
 
-    cv2.putText(frame, posture_state, (20, 40),
-                cv2.FONT_HERSHEY_SIMPLEX, 1, color, 3)
+        if cv2.waitKey(1) & 0xFF == ord('q'):
+            break
 
-    cv2.imshow("Posture Check", frame)
+    cap.release()
+    landmarker.close()
+    cv2.destroyAllWindows()
 
-    if cv2.waitKey(1) & 0xFF == ord('q'):
-        break
 
-cap.release()
-landmarker.close()
-cv2.destroyAllWindows()
\ No newline at end of file
+if __name__ == "__main__":
+    main()
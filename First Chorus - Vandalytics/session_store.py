@@ -0,0 +1,168 @@
+import csv
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+# Session log for the coaches. Rows are handed to a background writer thread
+# through a queue (a put costs well under a microsecond), and the writer
+# inserts them in batches, one transaction per batch, into a SQLite database
+# in WAL mode so readers never block it. Optionally a table can be mirrored to
+# a CSV file, written by the same thread from a file it keeps open; tables the
+# older versions wrote to CSV keep those files' header, column order and
+# timestamp format, so existing files can still be appended to and imported.
+
+DB_FILE = "vandalytics.db"
+BATCH = 1024       # most rows per transaction
+INTERVAL = 0.25    # longest a row waits before it is committed (seconds)
+
+SCHEMA = {
+    "frames": [("ts", "REAL"), ("offset", "REAL"), ("smooth_offset", "REAL"), ("status", "TEXT")],
+    "shots": [("ts", "REAL"), ("round", "INTEGER"), ("offset", "REAL")],
+    "rounds": [("ts", "REAL"), ("round", "INTEGER"), ("avg_offset", "REAL"), ("max_offset", "REAL"),
+               ("std_dev", "REAL"), ("shots", "INTEGER"), ("tip", "TEXT")],
+    "trials": [("ts", "REAL"), ("trial", "INTEGER"), ("reaction_ms", "REAL"), ("raw_ms", "REAL"),
+               ("render_ms", "REAL"), ("dispatch_ms", "REAL")],
+}
+
+# table -> (header, row -> CSV row) of the CSV files older versions wrote
+LEGACY_CSV = {
+    "rounds": (["Timestamp", "Round", "AvgOffset", "MaxOffset", "StdDev", "Shots", "Tip"],
+               lambda row: [time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(row[0]))] + list(row[1:])),
+    "frames": (["timestamp", "offset", "smooth_offset", "status"], list),
+}
+
+_STOP = object()
+
+
+def connect(path=DB_FILE):
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("CREATE TABLE IF NOT EXISTS sessions (id INTEGER PRIMARY KEY, tool TEXT, started REAL, ended REAL)")
+    for table, columns in SCHEMA.items():
+        cols = ", ".join(f"{name} {kind}" for name, kind in columns)
+        conn.execute(f"CREATE TABLE IF NOT EXISTS {table} (session INTEGER REFERENCES sessions(id), {cols})")
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_session ON {table}(session)")
+    conn.commit()
+    return conn
+
+
+class SessionStore:
+    """One tool run's rows, written to path by a background thread.
+
+    mirror maps a table name to a CSV path that receives the same rows.
+    """
+
+    def __init__(self, path=DB_FILE, tool="coach", mirror=None, batch=BATCH, interval=INTERVAL):
+        self.path = path
+        self.tool = tool
+        self.mirror = mirror or {}
+        self.batch = batch
+        self.interval = interval
+        self.queue = queue.SimpleQueue()
+        self.session = None
+        self.written = 0
+        self.commits = 0
+        self.error = None
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="session-store", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self.error is not None:
+            raise self.error
+
+    # ---- producers (any thread) ----
+
+    def frame(self, ts, offset, smooth_offset, status=None):
+        self.queue.put(("frames", (ts, offset, smooth_offset, status)))
+
+    def shot(self, ts, round_num, offset):
+        self.queue.put(("shots", (ts, round_num, offset)))
+
+    def round(self, ts, round_num, avg_offset, max_offset, std_dev, shots, tip):
+        self.queue.put(("rounds", (ts, round_num, avg_offset, max_offset, std_dev, shots, tip)))
+
+    def trial(self, ts, trial, reaction_ms, raw_ms, render_ms, dispatch_ms):
+        self.queue.put(("trials", (ts, trial, reaction_ms, raw_ms, render_ms, dispatch_ms)))
+
+    def close(self):
+        # flushes everything queued so far, then stops the writer
+        if self._thread.is_alive():
+            self.queue.put(_STOP)
+            self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ---- writer thread ----
+
+    def _run(self):
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = connect(self.path)
+            cur = conn.execute("INSERT INTO sessions (tool, started) VALUES (?, ?)", (self.tool, time.time()))
+            self.session = cur.lastrowid
+            conn.commit()
+            mirrors = {table: _open_mirror(path, table) for table, path in self.mirror.items()}
+        except Exception as e:
+            self.error = e
+            self._ready.set()
+            return
+        self._ready.set()
+
+        inserts = {table: f"INSERT INTO {table} VALUES (?, {', '.join('?' * len(cols))})"
+                   for table, cols in SCHEMA.items()}
+        stopping = False
+        try:
+            while not stopping:
+                try:
+                    item = self.queue.get(timeout=self.interval)
+                except queue.Empty:
+                    continue
+                rows = {}
+                while True:
+                    if item is _STOP:
+                        stopping = True
+                        break
+                    table, row = item
+                    rows.setdefault(table, []).append((self.session,) + row)
+                    if sum(len(r) for r in rows.values()) >= self.batch:
+                        break
+                    try:
+                        item = self.queue.get_nowait()
+                    except queue.Empty:
+                        break
+                with conn:
+                    for table, batch in rows.items():
+                        conn.executemany(inserts[table], batch)
+                self.written += sum(len(r) for r in rows.values())
+                self.commits += 1
+                for table, batch in rows.items():
+                    if table in mirrors:
+                        f, writer, fmt = mirrors[table]
+                        writer.writerows(fmt(row[1:]) for row in batch)
+                        f.flush()
+            with conn:
+                conn.execute("UPDATE sessions SET ended = ? WHERE id = ?", (time.time(), self.session))
+        except Exception as e:
+            self.error = e
+            print(f"session store: writer stopped: {e}")
+        finally:
+            conn.close()
+            for f, _, _ in mirrors.values():
+                f.close()
+
+
+def _open_mirror(path, table):
+    header, fmt = LEGACY_CSV.get(table, ([name for name, _ in SCHEMA[table]], list))
+    exists = os.path.isfile(path) and os.path.getsize(path) > 0
+    f = open(path, "a", newline="", encoding="utf-8")
+    writer = csv.writer(f)
+    if not exists:
+        writer.writerow(header)
+    return f, writer, fmt
@@ -0,0 +1,22 @@
+import json
+import os
+import time
+
+# Startup probe for startup_bench.py. When VANDALYTICS_STARTUP names a file,
+# the first call to first_frame() writes the wall-clock time the tool put its
+# first frame on screen there. Without the variable it does nothing.
+
+ENV = "VANDALYTICS_STARTUP"
+_reported = False
+
+
+def first_frame(tool):
+    global _reported
+    if _reported:
+        return
+    _reported = True
+    path = os.environ.get(ENV)
+    if not path:
+        return
+    with open(path, "w") as f:
+        json.dump({"tool": tool, "first_frame": time.time()}, f)
@@ -0,0 +1,113 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import startup
+
+# Startup benchmark for the tool entry points. For each tool it measures
+#   import_ms       importing the module in a fresh interpreter (should be
+#                   cheap now that heavy dependencies load inside main())
+#   first_frame_ms  launching the script until startup.first_frame() fires
+# and exits non-zero if any tool is over its budget or fails to start.
+
+TOOLS = {
+    "coach": {"argv": ["coach.py"], "import_ms": 400, "first_frame_ms": 2000},
+    "crosshair": {"argv": ["crosshair.py"], "import_ms": 400, "first_frame_ms": 2000},
+    "aim_train": {"argv": ["aim_train.py"], "import_ms": 300, "first_frame_ms": 1500},
+    "optimization": {"argv": ["optimization.py"], "import_ms": 300, "first_frame_ms": 1500},
+    "posture": {"argv": ["posture.py"], "import_ms": 300, "first_frame_ms": 5000},
+}
+
+IMPORT_SNIPPET = "import time; t = time.perf_counter(); import {0}; print((time.perf_counter() - t) * 1000)"
+
+
+def measure_import(module, repeat=3):
+    # best of repeat runs, each in a new interpreter
+    best = None
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", IMPORT_SNIPPET.format(module)],
+                             capture_output=True, text=True)
+        if out.returncode != 0:
+            raise RuntimeError(out.stderr.strip().splitlines()[-1] if out.stderr.strip() else "import failed")
+        ms = float(out.stdout.strip().splitlines()[-1])
+        best = ms if best is None else min(best, ms)
+    return best
+
+
+def measure_first_frame(argv, timeout=15.0):
+    fd, probe = tempfile.mkstemp(suffix=".json")
+    os.close(fd)
+    os.remove(probe)
+    env = dict(os.environ, **{startup.ENV: probe})
+    t0 = time.time()
+    proc = subprocess.Popen([sys.executable] + argv, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    try:
+        while time.time() - t0 < timeout:
+            if os.path.exists(probe):
+                try:
+                    with open(probe) as f:
+                        return (json.load(f)["first_frame"] - t0) * 1000
+                except ValueError:
+                    pass  # still being written
+            if proc.poll() is not None:
+                err = proc.stderr.read().decode(errors="replace").strip().splitlines()
+                raise RuntimeError(err[-1] if err else f"exited with {proc.returncode} before the first frame")
+            time.sleep(0.005)
+        raise RuntimeError(f"no frame within {timeout:.0f}s")
+    finally:
+        if proc.poll() is None:
+            proc.terminate()
+            try:
+                proc.wait(2)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+        if os.path.exists(probe):
+            os.remove(probe)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure tool import time and time-to-first-frame against budgets")
+    parser.add_argument("--tools", nargs="+", choices=sorted(TOOLS), default=list(TOOLS))
+    parser.add_argument("--repeat", type=int, default=3, help="Import runs per tool (best is reported)")
+    parser.add_argument("--timeout", type=float, default=15.0, help="Seconds to wait for a tool's first frame")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply every budget, e.g. for slow CI machines")
+    parser.add_argument("--import-only", action="store_true", help="Skip the first-frame measurement (no display needed)")
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    results = {}
+    failed = False
+    for name in args.tools:
+        tool = TOOLS[name]
+        row = {}
+        checks = [("import_ms", lambda: measure_import(os.path.splitext(tool["argv"][0])[0], args.repeat))]
+        if not args.import_only:
+            checks.append(("first_frame_ms", lambda: measure_first_frame(tool["argv"], args.timeout)))
+        for key, measure in checks:
+            budget = tool[key] * args.scale
+            try:
+                value = measure()
+            except RuntimeError as e:
+                row[key] = {"error": str(e), "budget": budget, "ok": False}
+                print(f"{name:13s} {key:15s} FAILED  {e}")
+                failed = True
+                continue
+            ok = value <= budget
+            row[key] = {"value": round(value, 1), "budget": budget, "ok": ok}
+            print(f"{name:13s} {key:15s} {value:8.1f} ms  (budget {budget:.0f})  {'ok' if ok else 'OVER BUDGET'}")
+            failed = failed or not ok
+        results[name] = row
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
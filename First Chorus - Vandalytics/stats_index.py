@@ -0,0 +1,162 @@
+import argparse
+import bisect
+import csv
+import sqlite3
+import threading
+import time
+
+from session_store import DB_FILE, SessionStore, connect
+
+# In-memory aggregates over the rounds table for the dashboard API.
+# refresh() only reads rows added since the last call (rowid > last seen) and
+# extends running prefix sums, so any time window is answered with two
+# bisects and a subtraction instead of a scan. Rows are read in ts order, not
+# rowid order: a CSV import or an offline coach run (stamped with clip time)
+# can add rounds older than ones already stored, and then the index is
+# rebuilt once.
+
+
+class StatsIndex:
+    def __init__(self, path=DB_FILE):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = None
+        self._reset()
+
+    def _reset(self):
+        self.last_rowid = 0
+        self.ts = []
+        # prefix sums, one longer than ts: cum[k] covers rounds [0, k)
+        self.cum_avg = [0.0]
+        self.cum_sd = [0.0]
+        self.cum_shots = [0]
+        self.shots = []
+        self.sessions = {}
+
+    def _connect(self):
+        if self.conn is None:
+            # creates the schema if no coach has run yet
+            connect(self.path).close()
+            self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        return self.conn
+
+    def _session(self, sid):
+        return self.sessions.setdefault(sid, {"rounds": 0, "shots": 0, "sum_avg": 0.0, "sum_sd": 0.0})
+
+    def _append(self, rows):
+        for rowid, session, ts, avg, sd, shots in rows:
+            avg, sd, shots = avg or 0.0, sd or 0.0, shots or 0
+            self.ts.append(ts)
+            self.cum_avg.append(self.cum_avg[-1] + avg)
+            self.cum_sd.append(self.cum_sd[-1] + sd)
+            self.cum_shots.append(self.cum_shots[-1] + shots)
+            self.shots.append(shots)
+            agg = self._session(session)
+            agg["rounds"] += 1
+            agg["shots"] += shots
+            agg["sum_avg"] += avg
+            agg["sum_sd"] += sd
+            self.last_rowid = max(self.last_rowid, rowid)
+
+    def refresh(self):
+        # returns the number of new rounds picked up
+        query = "SELECT rowid, session, ts, avg_offset, std_dev, shots FROM rounds"
+        with self.lock:
+            conn = self._connect()
+            rows = conn.execute(query + " WHERE rowid > ? ORDER BY ts, rowid", (self.last_rowid,)).fetchall()
+            if rows and self.ts and rows[0][2] < self.ts[-1]:
+                # older rounds arrived: rebuild once in time order
+                self._reset()
+                self._append(conn.execute(query + " ORDER BY ts, rowid"))
+            else:
+                self._append(rows)
+            # session rows are few; re-read them for start/end times
+            for sid, tool, started, ended in conn.execute("SELECT id, tool, started, ended FROM sessions"):
+                self._session(sid).update(tool=tool, started=started, ended=ended)
+        return len(rows)
+
+    def _span(self, start, end):
+        i = 0 if start is None else bisect.bisect_left(self.ts, start)
+        j = len(self.ts) if end is None else bisect.bisect_right(self.ts, end)
+        return i, max(i, j)
+
+    def summary(self, start=None, end=None):
+        with self.lock:
+            i, j = self._span(start, end)
+            n = j - i
+            return {
+                "start": start,
+                "end": end,
+                "rounds": n,
+                "shots": self.cum_shots[j] - self.cum_shots[i],
+                "avg_offset": (self.cum_avg[j] - self.cum_avg[i]) / n if n else None,
+                "std_dev": (self.cum_sd[j] - self.cum_sd[i]) / n if n else None,
+                "shots_per_round": (self.cum_shots[j] - self.cum_shots[i]) / n if n else None,
+            }
+
+    def rolling(self, window=20, start=None, end=None, points=200):
+        # mean AvgOffset / StdDev / shots over the `window` rounds up to each
+        # round in the range, thinned out to at most `points` samples
+        with self.lock:
+            i, j = self._span(start, end)
+            step = max(1, -(-(j - i) // max(1, points)))
+            series = []
+            for k in range(j - 1, i - 1, -step):
+                lo = max(0, k + 1 - window)
+                n = k + 1 - lo
+                series.append({
+                    "ts": self.ts[k],
+                    "avg_offset": (self.cum_avg[k + 1] - self.cum_avg[lo]) / n,
+                    "std_dev": (self.cum_sd[k + 1] - self.cum_sd[lo]) / n,
+                    "shots_per_round": (self.cum_shots[k + 1] - self.cum_shots[lo]) / n,
+                })
+            series.reverse()
+            return {"window": window, "points": series}
+
+    def shots_per_round(self, start=None, end=None, limit=500):
+        with self.lock:
+            i, j = self._span(start, end)
+            i = max(i, j - limit)
+            return [{"ts": self.ts[k], "shots": self.shots[k]} for k in range(i, j)]
+
+    def session_summaries(self, limit=50):
+        with self.lock:
+            out = []
+            for sid in sorted(self.sessions, reverse=True)[:limit]:
+                agg = self.sessions[sid]
+                n = agg["rounds"]
+                out.append({
+                    "session": sid,
+                    "tool": agg.get("tool"),
+                    "started": agg.get("started"),
+                    "ended": agg.get("ended"),
+                    "rounds": n,
+                    "shots": agg["shots"],
+                    "avg_offset": agg["sum_avg"] / n if n else None,
+                    "std_dev": agg["sum_sd"] / n if n else None,
+                    "shots_per_round": agg["shots"] / n if n else None,
+                })
+            return out
+
+
+def import_round_csv(csv_path, db_path=DB_FILE):
+    # one-off migration of an old round_stats.csv into the session database
+    rows = []
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            ts = time.mktime(time.strptime(row["Timestamp"], "%Y-%m-%d %H:%M:%S"))
+            rows.append((ts, int(row["Round"]), float(row["AvgOffset"]), float(row["MaxOffset"]),
+                         float(row["StdDev"]), int(row["Shots"]), row["Tip"]))
+    rows.sort()
+    with SessionStore(db_path, "csv-import") as store:
+        for row in rows:
+            store.round(*row)
+    return len(rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import round_stats.csv into the session database")
+    parser.add_argument("csv", help="round_stats.csv written by older coach versions")
+    parser.add_argument("--db", default=DB_FILE)
+    args = parser.parse_args()
+    print(f"imported {import_round_csv(args.csv, args.db)} rounds into {args.db}")
@@ -0,0 +1,152 @@
+import json
+import math
+import os
+
+# Constant-memory statistics for values that arrive one at a time.
+# RunningStats keeps count, mean and variance (Welford's update, which stays
+# accurate where sum / sum-of-squares cancels), min and max, and a P2 sketch
+# per tracked quantile (Jain & Chlamtac: five markers nudged towards their
+# ideal positions with a parabolic fit). Every add() is O(1) in time and
+# memory no matter how many values have been seen, so the coach can keep
+# round, session and lifetime stats live and show percentiles mid-round.
+
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+class P2Quantile:
+    """Streaming estimate of one quantile p in five floats."""
+
+    def __init__(self, p):
+        self.p = p
+        self.q = []  # marker heights; the first five values until full
+        self.n = [0, 1, 2, 3, 4]
+        self.want = [0.0, 2 * p, 4 * p, 2 + 2 * p, 4.0]
+        self.step = [0.0, p / 2, p, (1 + p) / 2, 1.0]
+
+    def add(self, x):
+        q, n = self.q, self.n
+        if len(q) < 5:
+            q.append(x)
+            q.sort()
+            return
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = 0
+            while x >= q[k + 1]:
+                k += 1
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self.want[i] += self.step[i]
+
+        # move the three middle markers back towards where they should be
+        for i in (1, 2, 3):
+            d = self.want[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                d = 1 if d > 0 else -1
+                h = q[i] + d / (n[i + 1] - n[i - 1]) * (
+                    (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+                    + (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1]))
+                if not q[i - 1] < h < q[i + 1]:
+                    h = q[i] + d * (q[i + d] - q[i]) / (n[i + d] - n[i])
+                q[i] = h
+                n[i] += d
+
+    def value(self):
+        q = self.q
+        if not q:
+            return None
+        if len(q) < 5:
+            # exact while there are too few values for the markers
+            pos = self.p * (len(q) - 1)
+            lo = int(pos)
+            hi = min(lo + 1, len(q) - 1)
+            return q[lo] + (q[hi] - q[lo]) * (pos - lo)
+        return q[2]
+
+
+class RunningStats:
+    """Count, mean, std dev, min/max and quantiles of a stream, in O(1)."""
+
+    def __init__(self, quantiles=QUANTILES):
+        self.quantiles = tuple(quantiles)
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = None
+        self.max = None
+        self.sketches = [P2Quantile(p) for p in self.quantiles]
+
+    def add(self, x):
+        x = float(x)
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+        self.min = x if self.min is None else min(self.min, x)
+        self.max = x if self.max is None else max(self.max, x)
+        for s in self.sketches:
+            s.add(x)
+
+    @property
+    def variance(self):
+        # sample variance, as statistics.variance
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+    @property
+    def max_abs(self):
+        if self.count == 0:
+            return None
+        return max(abs(self.min), abs(self.max))
+
+    def quantile(self, p):
+        return self.sketches[self.quantiles.index(p)].value()
+
+    def summary(self):
+        out = {"count": self.count, "mean": self.mean, "std": self.std, "min": self.min, "max": self.max}
+        for p, s in zip(self.quantiles, self.sketches):
+            out[f"p{round(p * 100):d}"] = s.value()
+        return out
+
+    def to_dict(self):
+        return {
+            "count": self.count, "mean": self.mean, "m2": self.m2, "min": self.min, "max": self.max,
+            "sketches": [{"p": s.p, "q": s.q, "n": s.n, "want": s.want} for s in self.sketches],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        stats = cls([s["p"] for s in data["sketches"]])
+        stats.count, stats.mean, stats.m2 = data["count"], data["mean"], data["m2"]
+        stats.min, stats.max = data["min"], data["max"]
+        for s, d in zip(stats.sketches, data["sketches"]):
+            s.q, s.n, s.want = list(d["q"]), list(d["n"]), list(d["want"])
+        return stats
+
+
+def load(path):
+    # RunningStats saved by save(), or a fresh one if the file is missing or bad
+    try:
+        with open(path) as f:
+            return RunningStats.from_dict(json.load(f))
+    except (OSError, ValueError, KeyError, TypeError):
+        return RunningStats()
+
+
+def save(stats, path):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(stats.to_dict(), f)
+    os.replace(tmp, path)
@@ -0,0 +1,197 @@
+import threading
+
+import cv2
+import numpy as np
+
+# Many-target engine for the aim trainer's drills.
+# All targets live in fixed-size NumPy arrays (position, velocity, radius,
+# shrink rate, alive flag) and move in one vectorised step per frame. After
+# each step a uniform grid over the screen is rebuilt (targets sorted by cell,
+# with per-cell start offsets), and published as an immutable snapshot so the
+# pynput thread can hit-test a click against the 3x3 cells around it without
+# locking the arrays. Hits are queued and applied on the next step, so only
+# the render thread ever writes the arrays. Drawing clears only the boxes
+# drawn into last frame (as overlay.Compositor does; with hundreds of targets
+# one fill is cheaper) and makes one
+# cv2.polylines call for all targets; thick outlines are drawn as concentric
+# 1px rings, which OpenCV rasterises far faster than thick lines.
+
+SCENARIOS = {
+    # count, radius, min/max speed (px/s), shrink (px/s), respawn
+    "tracking": {"count": 3, "radius": 40, "speed": (150, 400), "shrink": 0, "respawn": True},
+    "flick": {"count": 6, "radius": 30, "speed": (0, 0), "shrink": 12, "respawn": True},
+    "swarm": {"count": 300, "radius": 14, "speed": (60, 320), "shrink": 0, "respawn": True},
+    "shrink": {"count": 40, "radius": 35, "speed": (0, 80), "shrink": 15, "respawn": True},
+}
+
+MIN_RADIUS = 3
+CIRCLE_SEGMENTS = 24
+MAX_DIRTY = 64   # past this many boxes one fill() is cheaper than clearing each
+
+
+class TargetField:
+    def __init__(self, width, height, count=100, radius=20, speed=(0, 0), shrink=0, respawn=True, seed=None):
+        self.width, self.height = width, height
+        self.radius0 = float(radius)
+        self.speed = speed
+        self.shrink0 = float(shrink)
+        self.respawn = respawn
+        self.rng = np.random.default_rng(seed)
+        self.pos = np.zeros((count, 2), dtype=np.float32)
+        self.vel = np.zeros((count, 2), dtype=np.float32)
+        self.radius = np.zeros(count, dtype=np.float32)
+        self.shrink = np.zeros(count, dtype=np.float32)
+        self.age = np.zeros(count, dtype=np.float32)
+        self.alive = np.zeros(count, dtype=bool)
+        self.cell = max(8.0, 2.0 * self.radius0)
+        self.cols = int(np.ceil(width / self.cell))
+        self.rows = int(np.ceil(height / self.cell))
+        self.hits = []        # (index, age at hit) queued by the input thread
+        self.hit_lock = threading.Lock()
+        self.pending = set()
+        self.hit_ages = []
+        self.expired = 0
+        self.misses = 0
+        self.snapshot = None
+        self.spawn(np.arange(count))
+        self._index()
+
+    def spawn(self, idx):
+        n = len(idx)
+        if not n:
+            return
+        r = self.radius0
+        self.pos[idx, 0] = self.rng.uniform(r, self.width - r, n)
+        self.pos[idx, 1] = self.rng.uniform(r, self.height - r, n)
+        angle = self.rng.uniform(0, 2 * np.pi, n)
+        speed = self.rng.uniform(self.speed[0], self.speed[1], n)
+        self.vel[idx, 0] = np.cos(angle) * speed
+        self.vel[idx, 1] = np.sin(angle) * speed
+        self.radius[idx] = r
+        self.shrink[idx] = self.shrink0
+        self.age[idx] = 0
+        self.alive[idx] = True
+
+    def step(self, dt):
+        # apply queued hits, move / bounce / shrink everything, respawn
+        with self.hit_lock:
+            hits, self.hits = self.hits, []
+            self.pending.clear()
+        for i, age in hits:
+            self.alive[i] = False
+            self.hit_ages.append(age)
+        dead = np.array([i for i, _ in hits], dtype=np.intp)
+
+        live = self.alive
+        self.pos[live] += self.vel[live] * dt
+        r = self.radius[:, None]
+        low, high = r, np.array([self.width, self.height], dtype=np.float32) - r
+        out = (self.pos < low) | (self.pos > high)
+        self.vel[out] = -self.vel[out]
+        np.clip(self.pos, low, high, out=self.pos)
+        self.radius[live] -= self.shrink[live] * dt
+        self.age[live] += dt
+
+        gone = live & (self.radius < MIN_RADIUS)
+        self.expired += int(gone.sum())
+        self.alive &= ~gone
+        if self.respawn:
+            self.spawn(np.concatenate([dead, np.flatnonzero(gone)]))
+        self._index()
+
+    def _index(self):
+        idx = np.flatnonzero(self.alive)
+        cx = np.clip((self.pos[idx, 0] // self.cell).astype(np.intp), 0, self.cols - 1)
+        cy = np.clip((self.pos[idx, 1] // self.cell).astype(np.intp), 0, self.rows - 1)
+        cells = cy * self.cols + cx
+        order = np.argsort(cells, kind="stable")
+        starts = np.zeros(self.cols * self.rows + 1, dtype=np.intp)
+        np.cumsum(np.bincount(cells, minlength=self.cols * self.rows), out=starts[1:])
+        # copies, so the input thread never sees a half-updated step
+        self.snapshot = (idx[order], starts, self.pos.copy(), self.radius.copy(), self.age.copy())
+
+    def hit_test(self, x, y):
+        # safe from any thread; returns the target index hit, or None
+        members, starts, pos, radius, age = self.snapshot
+        cx, cy = int(x // self.cell), int(y // self.cell)
+        best, best_d = None, None
+        for gy in range(max(0, cy - 1), min(self.rows, cy + 2)):
+            row = gy * self.cols
+            lo = starts[row + max(0, cx - 1)]
+            hi = starts[row + min(self.cols - 1, cx + 1) + 1]
+            if lo == hi:
+                continue
+            cand = members[lo:hi]
+            d = (pos[cand, 0] - x) ** 2 + (pos[cand, 1] - y) ** 2
+            inside = d <= radius[cand] ** 2
+            if inside.any():
+                k = int(np.argmin(np.where(inside, d, np.inf)))
+                if best_d is None or d[k] < best_d:
+                    best, best_d = int(cand[k]), d[k]
+        with self.hit_lock:
+            if best is None:
+                self.misses += 1
+            elif best not in self.pending:
+                self.pending.add(best)
+                self.hits.append((best, float(age[best])))
+        return best
+
+    def outlines(self, rings=1):
+        # (N * rings, CIRCLE_SEGMENTS, 2) int32 polygons of the live targets
+        idx = np.flatnonzero(self.alive)
+        radius = (self.radius[idx, None] - np.arange(rings, dtype=np.float32)[None, :]).reshape(-1)
+        centre = np.repeat(self.pos[idx], rings, axis=0)
+        return (centre[:, None, :] + radius[:, None, None] * _UNIT[None]).astype(np.int32)
+
+
+class TargetRenderer:
+    """Draws a TargetField into a persistent black buffer in one call."""
+
+    def __init__(self, width, height, color=(0, 0, 255), thickness=2):
+        self.buffer = np.zeros((height, width, 3), dtype=np.uint8)
+        self.color = color
+        self.thickness = thickness
+        self.dirty = []  # (x0, y0, x1, y1) drawn into since the last clear; None is all of it
+
+    def _clear(self):
+        buf = self.buffer
+        if self.dirty is None:
+            buf.fill(0)
+        else:
+            for x0, y0, x1, y1 in self.dirty:
+                buf[y0:y1, x0:x1] = 0
+        self.dirty = []
+
+    def _mark(self, boxes):
+        # (N, 4) x0, y0, x1, y1, clipped to the buffer
+        if self.dirty is None:
+            return
+        h, w = self.buffer.shape[:2]
+        boxes = np.clip(boxes, 0, [w, h, w, h])
+        keep = (boxes[:, 0] < boxes[:, 2]) & (boxes[:, 1] < boxes[:, 3])
+        self.dirty += boxes[keep].tolist()
+
+    def draw(self, field):
+        # clears last frame's targets and text, then draws the field
+        self._clear()
+        pts = field.outlines(self.thickness)
+        if len(pts):
+            cv2.polylines(self.buffer, pts, True, self.color, 1)
+            # one box per target; its inner rings sit inside the outermost
+            outer = pts[::self.thickness]
+            if len(outer) > MAX_DIRTY:
+                self.dirty = None
+                return self.buffer
+            self._mark(np.concatenate([outer.min(axis=1) - 1, outer.max(axis=1) + 2], axis=1))
+        return self.buffer
+
+    def text(self, text, org, font, scale, color, thickness=1):
+        # cv2.putText whose box is cleared with the targets next frame
+        (w, h), baseline = cv2.getTextSize(text, font, scale, thickness)
+        cv2.putText(self.buffer, text, org, font, scale, color, thickness)
+        self._mark(np.array([[org[0] - thickness, org[1] - h - thickness,
+                              org[0] + w + thickness, org[1] + baseline + thickness]]))
+
+
+_angles = np.linspace(0, 2 * np.pi, CIRCLE_SEGMENTS, endpoint=False)
+_UNIT = np.stack([np.cos(_angles), np.sin(_angles)], axis=1).astype(np.float32)
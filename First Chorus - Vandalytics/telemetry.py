@@ -0,0 +1,184 @@
+import asyncio
+import json
+import socket
+import threading
+import time
+from collections import deque
+
+# Live event channel from the analysers to the dashboard.
+# Analysers use TelemetryClient: a background thread keeps one TCP connection
+# to main.py and sends newline-delimited JSON. The crosshair offset is
+# coalesced (only the newest value goes out, at most RATE times a second);
+# discrete events (shots, round ends) are queued and only dropped from the
+# queue once written, so a hub restart loses none of them. main.py runs the
+# TelemetryHub on its event loop and fans messages out to browsers over SSE.
+# Every browser gets its own bounded queue; offsets are coalesced per client
+# too, and a client that falls a whole queue behind on events is told it
+# lagged and disconnected rather than slowing anyone else down.
+
+TELEMETRY_ADDRESS = "127.0.0.1:8765"
+RATE = 20.0           # offset updates per second
+BACKLOG = 10000       # events kept while the hub is unreachable
+CLIENT_QUEUE = 256    # events buffered per browser before it is dropped
+KEEPALIVE = 15.0
+
+
+def parse_address(address):
+    host, _, port = address.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+class TelemetryClient:
+    def __init__(self, address=TELEMETRY_ADDRESS, tool="coach", rate=RATE, backlog=BACKLOG):
+        self.address = parse_address(address)
+        self.tool = tool
+        self.interval = 1.0 / rate
+        self.pending = deque(maxlen=backlog)
+        self.latest = None
+        self.sent = None
+        self.connected = False
+        self.running = True
+        self._thread = threading.Thread(target=self._run, name="telemetry", daemon=True)
+        self._thread.start()
+
+    def offset(self, value):
+        # cheap enough for every frame; only the newest value is sent
+        self.latest = (time.time(), value)
+
+    def event(self, kind, **fields):
+        self.pending.append({"type": kind, "tool": self.tool, "ts": time.time(), **fields})
+
+    def close(self, timeout=1.0):
+        # gives queued events a last chance to go out
+        self.running = False
+        self._thread.join(timeout)
+
+    def _run(self):
+        sock = None
+        backoff = 0.1
+        while self.running or (sock is not None and self.pending):
+            if sock is None:
+                try:
+                    sock = socket.create_connection(self.address, timeout=0.5)
+                    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                    self.connected = True
+                    backoff = 0.1
+                except OSError:
+                    time.sleep(backoff)
+                    backoff = min(backoff * 2, 2.0)
+                    continue
+            t0 = time.monotonic()
+            events = list(self.pending)
+            lines = [json.dumps(e) for e in events]
+            latest = self.latest
+            if latest is not None and latest is not self.sent:
+                lines.append(json.dumps({"type": "offset", "tool": self.tool, "ts": latest[0], "offset": latest[1]}))
+            if lines:
+                try:
+                    sock.sendall(("\n".join(lines) + "\n").encode())
+                except OSError:
+                    # unsent events stay queued for the next connection
+                    sock.close()
+                    sock = None
+                    self.connected = False
+                    continue
+                for e in events:
+                    # a full backlog may already have pushed it out
+                    if self.pending and self.pending[0] is e:
+                        self.pending.popleft()
+                self.sent = latest
+            wait = self.interval - (time.monotonic() - t0)
+            if wait > 0 and self.running:
+                time.sleep(wait)
+        if sock is not None:
+            sock.close()
+
+
+class Subscriber:
+    """One browser's view of the hub: latest offset plus queued events."""
+
+    def __init__(self, maxsize=CLIENT_QUEUE):
+        self.events = deque()
+        self.maxsize = maxsize
+        self.offset = None
+        self.lagged = False
+        self.wake = asyncio.Event()
+
+    def push(self, msg):
+        if msg.get("type") == "offset":
+            self.offset = msg
+        elif len(self.events) >= self.maxsize:
+            self.lagged = True
+        else:
+            self.events.append(msg)
+        self.wake.set()
+
+    async def next_batch(self, timeout):
+        try:
+            await asyncio.wait_for(self.wake.wait(), timeout)
+        except asyncio.TimeoutError:
+            return []
+        self.wake.clear()
+        batch = list(self.events)
+        self.events.clear()
+        if self.offset is not None:
+            batch.append(self.offset)
+            self.offset = None
+        return batch
+
+
+class TelemetryHub:
+    def __init__(self, address=TELEMETRY_ADDRESS, queue_size=CLIENT_QUEUE):
+        self.host, self.port = parse_address(address)
+        self.queue_size = queue_size
+        self.subscribers = set()
+        self.server = None
+        self.received = 0
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle, self.host, self.port)
+
+    async def stop(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    msg = json.loads(line)
+                except ValueError:
+                    continue
+                self.received += 1
+                for sub in self.subscribers:
+                    sub.push(msg)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def subscribe(self):
+        sub = Subscriber(self.queue_size)
+        self.subscribers.add(sub)
+        return sub
+
+    async def stream(self, request):
+        # server-sent events for one browser until it disconnects or lags
+        sub = self.subscribe()
+        try:
+            yield "retry: 2000\n\n"
+            while not await request.is_disconnected():
+                batch = await sub.next_batch(KEEPALIVE)
+                if sub.lagged:
+                    yield "event: lagged\ndata: {}\n\n"
+                    break
+                if not batch:
+                    yield ": keepalive\n\n"
+                for msg in batch:
+                    yield f"event: {msg.get('type', 'message')}\ndata: {json.dumps(msg)}\n\n"
+        finally:
+            self.subscribers.discard(sub)
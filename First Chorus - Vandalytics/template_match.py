@@ -0,0 +1,133 @@
+import cv2
+import numpy as np
+
+# Crosshair detector backed by a template bank and FFT correlation.
+# The crop is high-passed (|pixel - local mean|), so a crosshair of any
+# colour, with or without an outline, looks the same on any background. The
+# crosshair always sits on the screen's centre column, so only a vertical
+# strip through the middle of the crop is searched. For each crop size the
+# bank's zero-mean templates are centred in a common window, padded and
+# transformed once; a frame then costs one forward FFT of the strip and one
+# batched inverse FFT for the whole bank. Correlations are normalised per
+# window position (an integral image gives each window's mean and energy),
+# the best peak over the bank is refined to sub-pixel with a parabola through
+# its neighbours, and the normalised score is returned as the confidence.
+
+HIGHPASS = 5          # box size of the local mean removed before matching
+STRIP_MARGIN = 8      # columns searched either side of the widest template
+MIN_CONFIDENCE = 0.55  # textured crops without a crosshair peak below ~0.5
+
+
+def crosshair_template(arm, gap, thickness, dot=True):
+    # white-on-black crosshair with the usual four arms, centred
+    half = gap + arm + thickness + 1
+    img = np.zeros((2 * half + 1, 2 * half + 1), dtype=np.uint8)
+    c = half
+    for p1, p2 in (((c - gap - arm, c), (c - gap, c)), ((c + gap, c), (c + gap + arm, c)),
+                   ((c, c - gap - arm), (c, c - gap)), ((c, c + gap), (c, c + gap + arm))):
+        cv2.line(img, p1, p2, 255, thickness)
+    if dot:
+        cv2.circle(img, (c, c), max(1, thickness // 2), 255, -1)
+    return img
+
+
+def default_bank():
+    # arm / gap / thickness covering the common styles from 720p to 1440p
+    return [crosshair_template(arm, gap, t) for arm, gap, t in
+            ((4, 2, 1), (6, 3, 2), (8, 4, 2), (11, 5, 3), (14, 6, 3))]
+
+
+def highpass(gray):
+    g = gray.astype(np.float32)
+    return np.abs(g - cv2.blur(g, (HIGHPASS, HIGHPASS)))
+
+
+class _Plan:
+    """Template spectra for one crop shape."""
+
+    def __init__(self, templates, shape):
+        h, w = shape
+        # every template sits centred in one (th, tw) window
+        th = max(t.shape[0] for t in templates)
+        tw = max(t.shape[1] for t in templates)
+        self.window = (th, tw)
+        self.strip_w = min(w, tw + 2 * STRIP_MARGIN)
+        self.x0 = (w - self.strip_w) // 2
+        # the strip is padded by half a window top and bottom, so a crosshair
+        # right at the crop's edge can still be centred in a window
+        self.pad = th // 2
+        self.size = (cv2.getOptimalDFTSize(h + 2 * self.pad), cv2.getOptimalDFTSize(self.strip_w))
+        spectra = []
+        if tw <= self.strip_w:
+            for t in templates:
+                f = highpass(t)
+                f -= f.mean()
+                norm = float(np.sqrt((f * f).sum()))
+                if norm == 0:
+                    continue
+                padded = np.zeros((th, tw), dtype=np.float32)
+                y, x = (th - t.shape[0]) // 2, (tw - t.shape[1]) // 2
+                padded[y:y + t.shape[0], x:x + t.shape[1]] = f / norm
+                spectra.append(np.conj(np.fft.rfft2(padded, self.size)))
+        self.spectra = np.stack(spectra).astype(np.complex64) if spectra else None
+
+
+class TemplateDetector:
+    """detect_offset() replacement that also reports a confidence (1 = exact match)."""
+
+    def __init__(self, templates=None, min_confidence=MIN_CONFIDENCE):
+        self.bank = templates if templates is not None else default_bank()
+        self.min_confidence = min_confidence
+        self.plans = {}
+        self.confidence = 0.0
+
+    def plan(self, shape):
+        if shape not in self.plans:
+            self.plans[shape] = _Plan(self.bank, shape)
+        return self.plans[shape]
+
+    def detect(self, gray):
+        # (offset from the crop centre in px, confidence), offset None if unsure
+        plan = self.plan(gray.shape[:2])
+        if plan.spectra is None:
+            return None, 0.0
+        strip = highpass(gray[:, plan.x0:plan.x0 + plan.strip_w])
+        strip = cv2.copyMakeBorder(strip, plan.pad, plan.pad, 0, 0, cv2.BORDER_CONSTANT, value=0)
+        h, w = strip.shape
+        corr = np.fft.irfft2(np.fft.rfft2(strip, plan.size)[None] * plan.spectra, plan.size)
+        # spread of every window position; the templates are zero-mean with
+        # unit norm, so corr / spread is the normalised cross-correlation
+        th, tw = plan.window
+        vh, vw = h - th + 1, w - tw + 1
+        s1, s2 = cv2.integral2(strip, sdepth=cv2.CV_64F)[:2]
+        total = s1[th:, tw:] - s1[:vh, tw:] - s1[th:, :vw] + s1[:vh, :vw]
+        energy = s2[th:, tw:] - s2[:vh, tw:] - s2[th:, :vw] + s2[:vh, :vw]
+        spread = np.sqrt(np.maximum(energy - total * total / (th * tw), 1e-6)).astype(np.float32)
+        score = corr[:, :vh, :vw] / spread
+
+        k, y, x = np.unravel_index(int(np.argmax(score)), score.shape)
+        conf = float(score[k, y, x])
+        self.confidence = conf
+        if conf < self.min_confidence:
+            return None, conf
+        return y + _subpixel(score[k, :, x], y) + th // 2 - plan.pad - gray.shape[0] // 2, conf
+
+    def __call__(self, gray):
+        return self.detect(gray)[0]
+
+
+def _subpixel(column, y):
+    # vertex of the parabola through the peak and its two neighbours
+    if y <= 0 or y >= len(column) - 1:
+        return 0.0
+    a, b, c = column[y - 1], column[y], column[y + 1]
+    d = a - 2 * b + c
+    return float(0.5 * (a - c) / d) if d < 0 else 0.0
+
+
+detector = TemplateDetector()
+
+
+def detect_offset(gray):
+    # same contract as coach.detect_offset: px from the crop centre, or None
+    return detector(gray)
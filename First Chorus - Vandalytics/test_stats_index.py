@@ -0,0 +1,28 @@
+import os
+import tempfile
+
+from session_store import SessionStore
+from stats_index import StatsIndex
+
+
+def add_rounds(path, tool, stamps):
+    with SessionStore(path, tool) as store:
+        for n, ts in enumerate(stamps, 1):
+            store.round(ts, n, 10.0, 20.0, 5.0, 3, "")
+
+
+def test_rounds_out_of_time_order():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "sessions.db")
+        # one batch that is itself unsorted, then an import older than all of it
+        add_rounds(path, "coach", [2000.0, 3000.0, 2500.0])
+        index = StatsIndex(path)
+        index.refresh()
+        assert index.ts == [2000.0, 2500.0, 3000.0]
+        add_rounds(path, "csv-import", [1000.0])
+        index.refresh()
+        assert index.ts == [1000.0, 2000.0, 2500.0, 3000.0]
+        assert index.summary(1500, 2600)["rounds"] == 2
+        assert index.summary(0, 1500)["rounds"] == 1
+        assert index.summary()["shots"] == 12
+        index.conn.close()
@@ -0,0 +1,72 @@
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+# Pre-rendered text for the HUDs. Each (text, font, size, colour) is rasterised
+# once into an alpha mask plus a solid colour layer; drawing is then a single
+# cv2.blendLinear into the frame instead of a PIL round trip or a putText
+# call every frame. Entries are evicted least-recently-used.
+
+
+class TextSprites:
+    """LRU cache of text sprites for PIL fonts and OpenCV Hershey faces.
+
+    font is either a PIL ImageFont (org is the top-left corner, as with
+    ImageDraw.text) or a cv2.FONT_HERSHEY_* constant (org is the baseline
+    start, as with cv2.putText). color is in the frame's channel order.
+    """
+
+    def __init__(self, capacity=128):
+        self.capacity = capacity
+        self.sprites = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def draw(self, frame, text, org, color, font, scale=1.0, thickness=1):
+        key = (text, font, scale, thickness, tuple(int(c) for c in color))
+        sprite = self.sprites.get(key)
+        if sprite is None:
+            self.misses += 1
+            sprite = self._render(*key)
+            self.sprites[key] = sprite
+            if len(self.sprites) > self.capacity:
+                self.sprites.popitem(last=False)
+        else:
+            self.hits += 1
+            self.sprites.move_to_end(key)
+        _blend(frame, sprite, org)
+
+    def _render(self, text, font, scale, thickness, color):
+        if isinstance(font, int):
+            (w, h), baseline = cv2.getTextSize(text, font, scale, thickness)
+            pad = thickness + 1
+            mask = np.zeros((h + baseline + 2 * pad, w + 2 * pad), dtype=np.uint8)
+            cv2.putText(mask, text, (pad, h + pad), font, scale, 255, thickness, cv2.LINE_AA)
+            shift = (-pad, -(h + pad))
+        else:
+            from PIL import Image, ImageDraw
+
+            _, _, right, bottom = font.getbbox(text)
+            img = Image.new("L", (max(1, right), max(1, bottom)), 0)
+            ImageDraw.Draw(img).text((0, 0), text, font=font, fill=255)
+            mask = np.asarray(img)
+            shift = (0, 0)
+        alpha = mask.astype(np.float32) / 255.0
+        solid = np.empty(mask.shape + (len(color),), dtype=np.uint8)
+        solid[:] = color
+        return alpha, 1.0 - alpha, solid, shift
+
+
+def _blend(frame, sprite, org):
+    alpha, inv, solid, (sx, sy) = sprite
+    h, w = alpha.shape
+    x, y = int(org[0]) + sx, int(org[1]) + sy
+    fx0, fy0 = max(0, x), max(0, y)
+    fx1, fy1 = min(frame.shape[1], x + w), min(frame.shape[0], y + h)
+    if fx0 >= fx1 or fy0 >= fy1:
+        return
+    sy0, sx0 = fy0 - y, fx0 - x
+    sl = (slice(sy0, sy0 + fy1 - fy0), slice(sx0, sx0 + fx1 - fx0))
+    roi = frame[fy0:fy1, fx0:fx1]
+    cv2.blendLinear(solid[sl], roi, alpha[sl], inv[sl], dst=roi)
@@ -0,0 +1,225 @@
+import ast
+import multiprocessing
+import os
+import runpy
+import subprocess
+import sys
+import threading
+import time
+
+# Pre-warmed interpreters for the dashboard tools.
+# Spawning a fresh python for every /run/* request means paying for the
+# cv2 / numpy / PIL / mss imports before the first frame. The pool keeps a few
+# "spawn" processes alive that have already imported the third-party modules
+# the tools it serves use (preload_for() reads them off the scripts and the
+# local modules they import, lazy imports included) and are blocked on a
+# pipe; launching a tool just sends the script and its arguments to one of
+# them, which then runs it with runpy as
+# __main__. Each process runs one tool and exits with it, and the pool is
+# topped back up in the background. With size 0 every launch is cold: the
+# same bootstrap is spawned on demand and does the imports itself, so the
+# reported startup times are comparable.
+#
+# startup_ms is the time from launch() until the worker has its heavy modules
+# imported and is about to execute the tool's own code; it stays None until
+# the worker reports it, nothing waits for it.
+
+PRELOAD = ("numpy", "cv2", "PIL.Image", "PIL.ImageFont", "mss")
+POOL_SIZE = 2
+
+
+def preload_for(scripts):
+    """Third-party modules imported anywhere in scripts or the local modules they import."""
+    found, seen = set(), set()
+    todo = [os.path.abspath(s) for s in scripts]
+    while todo:
+        path = todo.pop()
+        if path in seen:
+            continue
+        seen.add(path)
+        with open(path, encoding="utf-8") as f:
+            tree = ast.parse(f.read(), path)
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                names = [a.name for a in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+                # "from PIL import ImageFont" may name a submodule; _preload skips the rest
+                names = [node.module] + [f"{node.module}.{a.name}" for a in node.names]
+            else:
+                continue
+            for name in names:
+                top = name.split(".")[0]
+                local = os.path.join(os.path.dirname(path), top + ".py")
+                if os.path.isfile(local):
+                    todo.append(local)
+                elif top not in sys.stdlib_module_names:
+                    found.add(name)
+    return tuple(sorted(found))
+
+
+def _preload(modules):
+    for name in modules:
+        try:
+            __import__(name)
+        except Exception:
+            # missing, or not a module (from x import function)
+            pass
+
+
+def _serve(conn, modules, cwd):
+    os.chdir(cwd)
+    _preload(modules)
+    conn.send(("ready", time.time()))
+    try:
+        job = conn.recv()
+    except EOFError:
+        return
+    if job is None:
+        return
+    script, args = job
+    _preload(modules)  # no-op when warm; the cold path pays for it here
+    conn.send(("started", time.time()))
+    conn.close()
+    sys.argv = [script] + list(args)
+    sys.path.insert(0, os.path.dirname(os.path.abspath(script)))
+    runpy.run_path(script, run_name="__main__")
+
+
+class PooledProcess:
+    """Popen-like handle on a pool process running a tool."""
+
+    def __init__(self, process, conn, warm):
+        self.process = process
+        self.conn = conn
+        self.warm = warm
+        self.launched = None
+        self.started = None
+
+    @property
+    def pid(self):
+        return self.process.pid
+
+    def run(self, script, args):
+        self.launched = time.time()
+        self.conn.send((script, list(args)))
+        return self
+
+    @property
+    def startup_ms(self):
+        # filled in once the worker reports that the tool is running
+        if self.started is None and self.conn is not None:
+            try:
+                while self.conn.poll():
+                    kind, stamp = self.conn.recv()
+                    if kind == "started":
+                        self.started = stamp
+                        self.conn.close()
+                        self.conn = None
+                        break
+            except (EOFError, OSError):
+                self.conn = None
+        if self.started is None:
+            return None
+        return round((self.started - self.launched) * 1000, 1)
+
+    def poll(self):
+        return self.process.exitcode
+
+    def wait(self, timeout=None):
+        self.process.join(timeout)
+        if self.process.exitcode is None:
+            raise subprocess.TimeoutExpired(self.process.name, timeout)
+        return self.process.exitcode
+
+    def terminate(self):
+        self.process.terminate()
+
+    def kill(self):
+        self.process.kill()
+
+
+class WarmPool:
+    def __init__(self, size=POOL_SIZE, modules=PRELOAD, cwd=None):
+        self.size = size
+        self.modules = tuple(modules)
+        self.cwd = cwd or os.getcwd()
+        self.ctx = multiprocessing.get_context("spawn")
+        self.idle = []
+        self.lock = threading.Lock()
+        self.warm_starts = 0
+        self.cold_starts = 0
+        self.closed = False
+        self.filling = False
+
+    def _spawn(self):
+        parent, child = self.ctx.Pipe()
+        process = self.ctx.Process(target=_serve, args=(child, self.modules, self.cwd), name="vandalytics-worker")
+        process.start()
+        child.close()
+        return process, parent
+
+    def _fill(self):
+        while True:
+            with self.lock:
+                if self.closed or len(self.idle) >= self.size:
+                    self.filling = False
+                    return
+            spawned = self._spawn()
+            with self.lock:
+                if self.closed:
+                    spawned[1].send(None)
+                    self.filling = False
+                    return
+                self.idle.append(spawned)
+
+    def start(self):
+        with self.lock:
+            if self.filling or self.closed:
+                return self
+            self.filling = True
+        threading.Thread(target=self._fill, daemon=True).start()
+        return self
+
+    def _take(self):
+        # prefer a worker that has finished its imports
+        with self.lock:
+            alive = [(p, c) for p, c in self.idle if p.is_alive()]
+            self.idle = alive
+            for i, (p, c) in enumerate(alive):
+                if c.poll():
+                    return alive.pop(i)
+            return alive.pop(0) if alive else None
+
+    def launch(self, argv):
+        taken = self._take()
+        warm = taken is not None
+        if warm:
+            self.warm_starts += 1
+        else:
+            self.cold_starts += 1
+            taken = self._spawn()
+        process, conn = taken
+        proc = PooledProcess(process, conn, warm)
+        proc.run(argv[0], argv[1:])
+        if self.size:
+            self.start()
+        return proc
+
+    def stats(self):
+        with self.lock:
+            ready = sum(1 for _, c in self.idle if c.poll())
+            return {"size": self.size, "idle": len(self.idle), "ready": ready,
+                    "warm_starts": self.warm_starts, "cold_starts": self.cold_starts}
+
+    def close(self):
+        with self.lock:
+            self.closed = True
+            idle, self.idle = self.idle, []
+        for process, conn in idle:
+            try:
+                conn.send(None)
+            except OSError:
+                pass
+            process.join(timeout=1.0)
+            if process.is_alive():
+                process.terminate()
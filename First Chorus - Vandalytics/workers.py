@@ -0,0 +1,245 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# Supervisor for the tool processes started from the dashboard.
+# Each tool runs at most once: a start request for a tool that is already
+# running returns the existing worker instead of spawning a copy. Exited
+# workers are reaped lazily whenever the registry is touched. CPU / RSS come
+# from psutil when it is installed, else from /proc on Linux or the process
+# APIs (via ctypes) on Windows; USAGE_SOURCE says which, and the status
+# output says why the fields are None if none of them is available. With a
+# worker_pool.WarmPool the tools are launched in pre-warmed interpreters
+# instead of a fresh subprocess.
+
+MAX_WORKERS = 3
+STOP_TIMEOUT = 3.0
+
+if psutil is not None:
+    USAGE_SOURCE = "psutil"
+elif sys.platform == "win32":
+    USAGE_SOURCE = "win32"
+elif os.path.isdir("/proc/self"):
+    USAGE_SOURCE = "proc"
+else:
+    USAGE_SOURCE = None
+USAGE_MISSING = None if USAGE_SOURCE else "no psutil (pip install psutil) and no /proc or win32 fallback"
+
+
+class WorkerLimitError(RuntimeError):
+    pass
+
+
+class UnknownToolError(KeyError):
+    pass
+
+
+def _cpu_rss(pid):
+    # (cpu seconds, rss bytes) of pid without psutil, or None
+    if USAGE_SOURCE == "proc":
+        try:
+            with open(f"/proc/{pid}/stat") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+            with open(f"/proc/{pid}/statm") as f:
+                pages = int(f.read().split()[1])
+        except (OSError, IndexError, ValueError):
+            return None
+        # utime, stime are fields 14 and 15 of stat, 12 and 13 after the name
+        cpu = (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+        return cpu, pages * os.sysconf("SC_PAGE_SIZE")
+    if USAGE_SOURCE == "win32":
+        import ctypes
+        from ctypes import wintypes
+
+        class Counters(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD)] + [
+                (n, ctypes.c_size_t) for n in ("PeakWorkingSetSize", "WorkingSetSize", "QuotaPeakPagedPoolUsage",
+                                               "QuotaPagedPoolUsage", "QuotaPeakNonPagedPoolUsage",
+                                               "QuotaNonPagedPoolUsage", "PagefileUsage", "PeakPagefileUsage")]
+
+        kernel32 = ctypes.windll.kernel32
+        kernel32.OpenProcess.restype = wintypes.HANDLE
+        kernel32.CloseHandle.argtypes = [wintypes.HANDLE]
+        handle = kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return None
+        try:
+            times = [wintypes.FILETIME() for _ in range(4)]
+            counters = Counters(cb=ctypes.sizeof(Counters))
+            if not kernel32.GetProcessTimes(handle, *[ctypes.byref(t) for t in times]):
+                return None
+            if not kernel32.K32GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+                return None
+        finally:
+            kernel32.CloseHandle(handle)
+        # kernel + user time, in 100 ns units
+        cpu = sum((t.dwHighDateTime << 32 | t.dwLowDateTime) for t in times[2:]) / 1e7
+        return cpu, counters.WorkingSetSize
+    return None
+
+
+class Worker:
+    def __init__(self, name, proc):
+        self.name = name
+        self.proc = proc
+        self.started = time.time()
+        self.stopped = None
+        self.stop_requested = False
+        self.ps = None
+        self.last_cpu = None  # (wall, cpu seconds) of the previous fallback sample
+        if psutil is not None:
+            try:
+                self.ps = psutil.Process(proc.pid)
+                self.ps.cpu_percent(None)  # first call only primes the counter
+            except psutil.Error:
+                self.ps = None
+
+    @property
+    def pid(self):
+        return self.proc.pid
+
+    def alive(self):
+        return self.proc.poll() is None
+
+    def state(self):
+        code = self.proc.poll()
+        if code is None:
+            if self.stop_requested:
+                return "stopping"
+            # pooled tools report when their own code starts; until then they're starting
+            return "starting" if getattr(self.proc, "startup_ms", 0) is None else "running"
+        if self.stop_requested:
+            return "stopped"
+        return "exited" if code == 0 else "failed"
+
+    def usage(self):
+        # (cpu %, rss bytes) since the previous call, or (None, None)
+        if not self.alive():
+            return None, None
+        if self.ps is not None:
+            try:
+                with self.ps.oneshot():
+                    return self.ps.cpu_percent(None), self.ps.memory_info().rss
+            except psutil.Error:
+                return None, None
+        sample = _cpu_rss(self.pid) if psutil is None else None
+        if sample is None:
+            return None, None
+        cpu_s, rss = sample
+        now = time.time()
+        # like psutil, the first sample only primes the CPU counter
+        cpu = None
+        if self.last_cpu is not None and now > self.last_cpu[0]:
+            cpu = round((cpu_s - self.last_cpu[1]) / (now - self.last_cpu[0]) * 100, 1)
+        self.last_cpu = (now, cpu_s)
+        return cpu, rss
+
+    def info(self):
+        cpu, rss = self.usage()
+        end = self.stopped or time.time()
+        return {
+            "tool": self.name,
+            "pid": self.pid,
+            "state": self.state(),
+            "returncode": self.proc.poll(),
+            "started": self.started,
+            "uptime_s": round(end - self.started, 1),
+            "cpu_percent": cpu,
+            "rss_mb": round(rss / 2**20, 1) if rss is not None else None,
+            "warm": getattr(self.proc, "warm", False),
+            "startup_ms": getattr(self.proc, "startup_ms", None),
+        }
+
+
+class WorkerRegistry:
+    """Tracks one subprocess per tool name.
+
+    tools maps a tool name to the argv (after the interpreter) that starts it.
+    """
+
+    def __init__(self, tools, max_workers=MAX_WORKERS, python=sys.executable, pool=None):
+        self.tools = tools
+        self.max_workers = max_workers
+        self.python = python
+        self.pool = pool
+        self.workers = {}
+        self.lock = threading.Lock()
+
+    def _reap(self):
+        for w in self.workers.values():
+            if w.stopped is None and not w.alive():
+                w.stopped = time.time()
+
+    def running(self):
+        return [w for w in self.workers.values() if w.alive()]
+
+    def start(self, name):
+        # (worker, started) -- started is False if the tool was already running
+        if name not in self.tools:
+            raise UnknownToolError(name)
+        with self.lock:
+            self._reap()
+            current = self.workers.get(name)
+            if current is not None and current.alive() and not current.stop_requested:
+                return current, False
+            if len(self.running()) >= self.max_workers:
+                raise WorkerLimitError(f"{self.max_workers} tools already running")
+            if self.pool is not None:
+                proc = self.pool.launch(self.tools[name])
+            else:
+                proc = subprocess.Popen([self.python] + list(self.tools[name]))
+            worker = Worker(name, proc)
+            self.workers[name] = worker
+            return worker, True
+
+    def stop(self, name, timeout=STOP_TIMEOUT):
+        if name not in self.tools:
+            raise UnknownToolError(name)
+        with self.lock:
+            worker = self.workers.get(name)
+            if worker is None:
+                return None
+            if worker.alive():
+                worker.stop_requested = True
+                worker.proc.terminate()
+        if worker.alive():
+            try:
+                worker.proc.wait(timeout)
+            except subprocess.TimeoutExpired:
+                worker.proc.kill()
+                worker.proc.wait()
+        with self.lock:
+            self._reap()
+        return worker
+
+    def stop_all(self, timeout=STOP_TIMEOUT):
+        for name in list(self.workers):
+            self.stop(name, timeout)
+
+    def status(self, name=None):
+        with self.lock:
+            self._reap()
+            if name is not None:
+                if name not in self.tools:
+                    raise UnknownToolError(name)
+                worker = self.workers.get(name)
+                return worker.info() if worker else {"tool": name, "state": "idle"}
+            return {
+                "max_workers": self.max_workers,
+                "running": len(self.running()),
+                "psutil": psutil is not None,
+                "usage_source": USAGE_SOURCE,
+                "usage_missing": USAGE_MISSING,
+                "pool": self.pool.stats() if self.pool is not None else None,
+                "workers": [
+                    self.workers[n].info() if n in self.workers else {"tool": n, "state": "idle"}
+                    for n in self.tools
+                ],
+            }
@@ -100,79 +100,81 @@ def main():
         if os.path.getsize(args.log) == 0:
             csv_writer.writerow(["timestamp", "offset", "smooth_offset", "status"])
  
-    with mss.mss() as sct:
-        monitor = sct.monitors[1]
+    try:
+        with mss.mss() as sct:
+            monitor = sct.monitors[1]
+ 
+            print("Minimal AI Crosshair Coach Running (Rajdhani UI)...")
+            print("Press Q to quit")
+ 
+            frame_counter = 0
+            while True:
+                start_time = time.time()
+ 
+                # Capture screen
+                frame = np.array(sct.grab(monitor))
+                gray_full = cv2.cvtColor(frame, cv2.COLOR_BGRA2GRAY)
+ 
+                # Center crop (crosshair zone)
+                crop = center_crop(gray_full, CROP_SIZE)
  
-        print("Minimal AI Crosshair Coach Running (Rajdhani UI)...")
-        print("Press Q to quit")
+                # Detect vertical offset (align measurement with visible guide)
+                # Subtract GUIDE_OFFSET so the decision reference matches the drawn line
+                offset = detect_offset(crop) - GUIDE_OFFSET
+                history.append(offset)
+                smooth_offset = int(np.mean(history))
  
-        frame_counter = 0
-        while True:
-            start_time = time.time()
+                # Get coaching status
+                status, color = get_status(smooth_offset)
  
-            # Capture screen
-            frame = np.array(sct.grab(monitor))
-            gray_full = cv2.cvtColor(frame, cv2.COLOR_BGRA2GRAY)
+                # Log per-frame metrics if requested
+                if csv_writer:
+                    try:
+                        csv_writer.writerow([time.time(), int(offset), int(smooth_offset), status])
+                        log_file.flush()
+                    except Exception:
+                        pass
  
-            # Center crop (crosshair zone)
-            crop = center_crop(gray_full, CROP_SIZE)
+                # Convert to BGR for display
+                vis = cv2.cvtColor(crop, cv2.COLOR_GRAY2BGR)
+                h, w = vis.shape[:2]
  
-            # Detect vertical offset (align measurement with visible guide)
-            # Subtract GUIDE_OFFSET so the decision reference matches the drawn line
-            offset = detect_offset(crop) - GUIDE_OFFSET
-            history.append(offset)
-            smooth_offset = int(np.mean(history))
+                # Minimal center guide line (head level reference)
+                cv2.line(vis, (0, h // 2 + GUIDE_OFFSET), (w, h // 2 + GUIDE_OFFSET), (60, 60, 60), 1)
  
-            # Get coaching status
-            status, color = get_status(smooth_offset)
+                # ===== CLEAN RAJDHANI TEXT (NO UGLY OPENCV FONT) =====
+                # Convert BGR (OpenCV) -> RGB (Pillow) so colors render correctly
+                pil_img = Image.fromarray(cv2.cvtColor(vis, cv2.COLOR_BGR2RGB))
+                draw = ImageDraw.Draw(pil_img)
  
-            # Log per-frame metrics if requested
-            if csv_writer:
+                # Ensure color is an RGB tuple (get_status returns RGB-style tuples)
                 try:
-                    csv_writer.writerow([time.time(), int(offset), int(smooth_offset), status])
-                    log_file.flush()
+                    fill_color = tuple(int(c) for c in color)
                 except Exception:
-                    pass
- 
-            # Convert to BGR for display
-            vis = cv2.cvtColor(crop, cv2.COLOR_GRAY2BGR)
-            h, w = vis.shape[:2]
- 
-            # Minimal center guide line (head level reference)
-            cv2.line(vis, (0, h // 2 + GUIDE_OFFSET), (w, h // 2 + GUIDE_OFFSET), (60, 60, 60), 1)
- 
-            # ===== CLEAN RAJDHANI TEXT (NO UGLY OPENCV FONT) =====
-            # Convert BGR (OpenCV) -> RGB (Pillow) so colors render correctly
-            pil_img = Image.fromarray(cv2.cvtColor(vis, cv2.COLOR_BGR2RGB))
-            draw = ImageDraw.Draw(pil_img)
- 
-            # Ensure color is an RGB tuple (get_status returns RGB-style tuples)
-            try:
-                fill_color = tuple(int(c) for c in color)
-            except Exception:
-                fill_color = (255, 255, 255)
- 
-            # Minimal top-left text
-            draw.text((14, 10), status, font=font, fill=fill_color)
- 
-            # Convert back to OpenCV BGR image for display
-            vis = cv2.cvtColor(np.array(pil_img), cv2.COLOR_RGB2BGR)
-            # =====================================================
- 
-            cv2.imshow("AI Coach", vis)
- 
-            # FPS limiter (stable for games)
-            elapsed = time.time() - start_time
-            delay = max(1, int((1 / FPS_LIMIT - elapsed) * 1000))
- 
-            frame_counter += 1
-            if cv2.waitKey(delay) & 0xFF == ord('q'):
-                break
-            if args.max_frames > 0 and frame_counter >= args.max_frames:
-                break
-    cv2.destroyAllWindows()
-    if log_file:
-        log_file.close()
+                    fill_color = (255, 255, 255)
+ 
+                # Minimal top-left text
+                draw.text((14, 10), status, font=font, fill=fill_color)
+ 
+                # Convert back to OpenCV BGR image for display
+                vis = cv2.cvtColor(np.array(pil_img), cv2.COLOR_RGB2BGR)
+                # =====================================================
+ 
+                cv2.imshow("AI Coach", vis)
+ 
+                # FPS limiter (stable for games)
+                elapsed = time.time() - start_time
+                delay = max(1, int((1 / FPS_LIMIT - elapsed) * 1000))
+ 
+                frame_counter += 1
+                if cv2.waitKey(delay) & 0xFF == ord('q'):
+                    break
+                if args.max_frames > 0 and frame_counter >= args.max_frames:
+                    break
+    finally:
+        cv2.destroyAllWindows()
+        if log_file:
+            log_file.close()
  
  
 if __name__ == '__main__':